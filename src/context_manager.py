@@ -6,6 +6,9 @@ class DroneContextManager:
         self.client = client
         self.drone_map = {}  # 存储 { "Drone 1": "id_123", "Drone 2": "id_456" }
         self.drone_info_summary = "" # 存储给 LLM 看的精简文本
+        self._lower_map = {}  # 小写名称索引 { "drone 1": "id_123" }，供 get_id_by_name 使用
+        self.version = 0  # 机队信息版本号，仅在 refresh() 得到的内容发生变化时递增
+        self._cached_ctx = (-1, "")  # (版本号, 渲染好的上下文文本)
 
     def refresh(self):
         """调用 list_drones 并构建精简映射表"""
@@ -15,35 +18,56 @@ class DroneContextManager:
         # 这里模拟直接调用 client 的方法，你需要根据你的 execute_command 调整
         drones_list = self.client.list_drones() 
         
-        # 2. 清空旧数据
-        self.drone_map = {}
-        summary_lines = []
-
-        # 3. 提取关键信息 (过滤掉 useless 的字段)
-        for drone in drones_list:
-            d_name = drone.get('name', 'Unknown') # 例如 "Drone 1"
-            d_id = drone.get('id')                # 例如 "487bc0b6"
-            d_status = drone.get('status')        # 例如 "idle"
-            
-            # 建立映射
-            self.drone_map[d_name] = d_id
-            
-            # 构建给 LLM 看的单行简介
-            # 格式: - Drone 1 (ID: 487bc0b6): [idle]
-            summary_lines.append(f"- {d_name} (ID: {d_id}): [{d_status}]")
-
-        self.drone_info_summary = "\n".join(summary_lines)
+        drones = list(drones_list)  # 需要遍历两次，确保不是一次性迭代器
+
+        # 2. 建立映射 (整体替换旧数据)，例如 { "Drone 1": "487bc0b6" }
+        # 3. 构建给 LLM 看的精简简介 (过滤掉 useless 的字段)
+        # 格式: - Drone 1 (ID: 487bc0b6): [idle]
+        old_summary = self.drone_info_summary
+        try:
+            # 快速路径：服务端返回的字段齐全，直接下标取值
+            self.drone_map = {d['name']: d['id'] for d in drones}
+            self.drone_info_summary = "\n".join(
+                f"- {d['name']} (ID: {d['id']}): [{d['status']}]" for d in drones
+            )
+        except KeyError:
+            # 兜底：存在缺字段的记录，使用带默认值的写法
+            self.drone_map = {d.get('name', 'Unknown'): d.get('id') for d in drones}
+            self.drone_info_summary = "\n".join(
+                f"- {d.get('name', 'Unknown')} (ID: {d.get('id')}): [{d.get('status')}]"
+                for d in drones
+            )
+        self._lower_map = {name.lower(): pid for name, pid in self.drone_map.items()}
+        # 机队未变化时保持版本号不变，上下文文本逐字节一致，Ollama 前缀 KV Cache 得以复用
+        if self.drone_info_summary != old_summary:
+            self.version += 1
         print(f"✅ 无人机列表已更新，共发现 {len(self.drone_map)} 架无人机。")
 
     def get_id_by_name(self, name_query):
         """辅助函数：尝试根据名字找ID (也可以让LLM自己找，这个函数给后端逻辑兜底)"""
-        for name, pid in self.drone_map.items():
-            if name.lower() in name_query.lower():
+        query = name_query.lower()
+
+        # 快速路径：查询本身就是无人机名称
+        pid = self._lower_map.get(query)
+        if pid is not None:
+            return pid
+
+        # 兜底：查询语句中包含无人机名称 (索引键已是小写)
+        for name, pid in self._lower_map.items():
+            if name in query:
                 return pid
         return None
 
     def get_system_prompt_context(self):
-        """返回注入到 System Prompt 中的文本"""
+        """返回注入到 System Prompt 中的文本 (按版本号缓存，机队变化后才重建)"""
+        version, text = self._cached_ctx
+        if version != self.version:
+            text = self._build_system_prompt_context()
+            self._cached_ctx = (self.version, text)
+        return text
+
+    def _build_system_prompt_context(self):
+        """根据当前的 drone_info_summary 渲染上下文文本"""
         return f"""
             当前可用无人机列表 (Name -> ID 映射):
             {self.drone_info_summary}
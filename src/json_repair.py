@@ -0,0 +1,179 @@
+# src/json_repair.py
+"""
+容错 JSON 解析 (用于本地小模型的不规范输出)
+
+单遍状态机扫描，处理以下常见问题：
+- JSON 前后的 Markdown 代码块标记与闲聊文字 ("Here's your JSON: ```json ...")
+- Python 字面量 (None / True / False)
+- 对象/数组末尾多余的逗号
+- 输出被截断：未闭合的字符串、数组、对象会被自动补全
+"""
+import json
+from typing import Any, Optional, Tuple
+
+# 字符串之外的裸单词 -> JSON 字面量
+_LITERALS = {
+    "None": "null",
+    "True": "true",
+    "False": "false",
+    "null": "null",
+    "true": "true",
+    "false": "false",
+}
+
+
+def _strip_trailing_comma(out: list):
+    """去掉 out 末尾 (忽略空白) 的逗号"""
+    i = len(out) - 1
+    while i >= 0 and out[i].isspace():
+        i -= 1
+    if i >= 0 and out[i] == ",":
+        del out[i]
+
+
+def _scan(text: str) -> Tuple[Optional[str], bool]:
+    """
+    扫描并修复 text 中的第一个 JSON 值。
+    :return: (修复后的 JSON 文本，没有找到 '{' 或 '[' 时为 None; 顶层结构是否已在原文中闭合)
+    """
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    if not starts:
+        return None, False
+
+    out = []
+    stack = []
+    in_string = False
+    escape = False
+    closed = False
+
+    i = min(starts)
+    n = len(text)
+    while i < n:
+        c = text[i]
+
+        if in_string:
+            out.append(c)
+            if escape:
+                escape = False
+            elif c == "\\":
+                escape = True
+            elif c == '"':
+                in_string = False
+            i += 1
+            continue
+
+        if c == '"':
+            in_string = True
+            out.append(c)
+        elif c in "{[":
+            stack.append("}" if c == "{" else "]")
+            out.append(c)
+        elif c in "}]":
+            _strip_trailing_comma(out)
+            if stack:
+                out.append(stack.pop())
+            if not stack:
+                closed = True
+                break
+        elif c.isalpha():
+            j = i
+            while j < n and (text[j].isalnum() or text[j] == "_"):
+                j += 1
+            word = text[i:j]
+            out.append(_LITERALS.get(word, word))
+            i = j
+            continue
+        else:
+            out.append(c)
+        i += 1
+
+    if not closed:
+        # 输出被截断：补全字符串、悬空的键值和所有未闭合的括号
+        if in_string:
+            if escape:
+                out.pop()
+            out.append('"')
+        _strip_trailing_comma(out)
+        tail = "".join(out).rstrip()
+        if tail.endswith(":"):
+            out.append(" null")
+        while stack:
+            _strip_trailing_comma(out)
+            out.append(stack.pop())
+
+    return "".join(out), closed
+
+
+def repair_json(text: str) -> str:
+    """返回修复后的 JSON 文本；找不到 JSON 起始符时抛出 ValueError"""
+    repaired, _ = _scan(text)
+    if repaired is None:
+        raise ValueError(f"未在输出中找到 JSON: {text[:80]!r}")
+    return repaired
+
+
+def parse_json_lenient(text: str) -> Any:
+    """容错解析：先修复再 json.loads"""
+    return json.loads(repair_json(text))
+
+
+class StreamingJSONExtractor:
+    """
+    流式 JSON 提取器：逐块 feed 模型输出，每次只扫描新到达的文本 (总体 O(n))，
+    第一个顶层 JSON 结构闭合时修复并解析，之后不再扫描。
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._pos = 0          # 已扫描的字符数
+        self._start = -1       # 顶层结构在累计文本中的起始位置，-1 表示尚未出现
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self.done = False      # 顶层结构是否已闭合
+        self.result = None     # 解析结果 (闭合但解析失败时为 None)
+
+    @property
+    def text(self) -> str:
+        """目前为止收到的全部文本"""
+        return "".join(self._chunks)
+
+    def feed(self, chunk: str) -> Optional[Any]:
+        """输入一段新文本；顶层结构闭合并解析成功时返回结果，否则返回 None"""
+        self._chunks.append(chunk)
+        if self.done:
+            return None
+
+        for i, c in enumerate(chunk):
+            if self._start < 0:
+                # 跳过 JSON 之前的闲聊与代码块标记
+                if c in "{[":
+                    self._start = self._pos + i
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+            elif c == '"':
+                self._in_string = True
+            elif c in "{[":
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self.done = True
+                    end = self._pos + i + 1
+                    repaired, _ = _scan(self.text[self._start:end])
+                    try:
+                        self.result = json.loads(repaired)
+                    except ValueError:
+                        return None
+                    return self.result
+
+        self._pos += len(chunk)
+        return None
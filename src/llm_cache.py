@@ -0,0 +1,119 @@
+# src/llm_cache.py
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
+
+
+class SemanticLLMCache:
+    """
+    LLM 决策的语义缓存。
+
+    缓存的决策是绝对目标坐标，只对产生它的位置有效，因此每个条目都带有位置 key
+    (调用方传入量化后的当前位置)，只有位置 key 相同的条目才可能命中。
+    查找分两级：
+    1. 精确匹配：Prompt 文本完全一致 (调用方先对状态做量化，使细微差异的状态得到相同文本)，
+       命中时无需计算 embedding。
+    2. 语义匹配：同一位置 key 下存在其他条目时，才对 Prompt 做 embedding 并 L2 归一化，
+       与这些条目做点积 (即余弦相似度)，超过阈值即视为命中；该位置没有条目时直接判定未命中。
+
+    条目超过 ttl 秒即失效，超过 max_entries 时按 LRU 淘汰。
+    """
+
+    def __init__(self, embedder, threshold: float = 0.92, ttl: float = 300, max_entries: int = 1024):
+        """
+        :param embedder: 提供 embed_query(text) -> List[float] 的对象 (如 LangChain 的 OllamaEmbeddings)
+        :param threshold: 余弦相似度命中阈值
+        :param ttl: 条目有效期 (秒)
+        :param max_entries: 最大条目数
+        """
+        self.embedder = embedder
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        # { prompt_text: (位置 key, 归一化向量, 响应, 写入时间 monotonic) }，顺序即 LRU 顺序
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        # 最近一次 get 未命中时计算的 embedding，供随后的 set 复用
+        self._last_query: Optional[tuple] = None
+        self._embedder_failed = False
+
+    def get(self, prompt_text: str, key: Hashable) -> Optional[Dict[str, Any]]:
+        """查找缓存，未命中返回 None。key 为产生该 Prompt 的位置 (量化后)"""
+        self._evict_expired()
+        self._last_query = None
+
+        # 1. 精确匹配 (Prompt 文本已包含量化位置，仍校验 key 以防调用方传入不一致的参数)
+        entry = self._entries.get(prompt_text)
+        if entry is not None and entry[0] == key:
+            self._entries.move_to_end(prompt_text)
+            return dict(entry[2])
+
+        # 2. 语义匹配：只在同一位置的条目之间比较，没有候选时不做 embedding
+        candidates = [k for k, e in self._entries.items() if e[0] == key]
+        if not candidates:
+            return None
+
+        query = self._embed(prompt_text)
+        if query is None:
+            return None
+        self._last_query = (prompt_text, query)
+
+        best_key, best_score = None, self.threshold
+        for k in candidates:
+            vec = self._entry_vector(k)
+            if vec is None:
+                continue
+            score = sum(a * b for a, b in zip(vec, query))
+            if score >= best_score:
+                best_key, best_score = k, score
+        if best_key is None:
+            return None
+
+        self._entries.move_to_end(best_key)
+        return dict(self._entries[best_key][2])
+
+    def set(self, prompt_text: str, key: Hashable, response: Dict[str, Any]):
+        """写入缓存；只复用 get 阶段已算好的 embedding，不为写入单独请求 embedding 服务"""
+        if self._last_query is not None and self._last_query[0] == prompt_text:
+            vec = self._last_query[1]
+        else:
+            vec = None
+        self._last_query = None
+
+        # 没有向量时仍写入，至少可以精确匹配
+        self._entries[prompt_text] = (key, vec, dict(response), time.monotonic())
+        self._entries.move_to_end(prompt_text)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _entry_vector(self, prompt_text: str) -> Optional[List[float]]:
+        """条目写入时未计算 embedding 的，在首次参与语义比较时补算并回写"""
+        pos_key, vec, response, ts = self._entries[prompt_text]
+        if vec is None:
+            vec = self._embed(prompt_text)
+            if vec is not None:
+                self._entries[prompt_text] = (pos_key, vec, response, ts)
+        return vec
+
+    def _embed(self, text: str) -> Optional[List[float]]:
+        """计算归一化 embedding；embedding 服务不可用时只提示一次并退化为仅精确匹配"""
+        if self._embedder_failed:
+            return None
+        try:
+            vec = [float(v) for v in self.embedder.embed_query(text)]
+        except Exception as e:
+            print(f"⚠️ Embedding 服务不可用，语义缓存退化为精确匹配: {e}")
+            self._embedder_failed = True
+            return None
+
+        norm = math.sqrt(sum(v * v for v in vec))
+        if norm == 0:
+            return None
+        return [v / norm for v in vec]
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        expired = [k for k, entry in self._entries.items() if now - entry[3] > self.ttl]
+        for k in expired:
+            del self._entries[k]
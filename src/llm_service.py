@@ -1,12 +1,49 @@
 # src\llm_service.py
 import os
+import re
 import json
-import copy
 from pathlib import Path
-from typing import Dict, Any, Optional
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional, Tuple
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
-from langchain_ollama import ChatOllama
+
+# orjson 为可选依赖，未安装时回退到标准库 json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+# 环境变量占位符，例如 "${DEEPSEEK_API_KEY}"
+_ENV_VAR_RE = re.compile(r"^\$\{([^}]+)\}$")
+
+# 已导入的 LangChain Provider 类: {llm_type: 类}
+# Provider 依赖较重，只在首次用到对应类型时导入
+_PROVIDER_CLASSES: Dict[str, Any] = {}
+
+# 配置文件缓存: {(绝对路径, mtime): 解析后的 dict}
+# 同一进程内多次构造 LLMService 时，文件未变化则跳过读盘与 json 解析
+_CONFIG_CACHE: Dict[Tuple[str, float], Dict[str, Any]] = {}
+
+
+def _get_provider_class(llm_type: str):
+    """按需导入并缓存 llm_type 对应的 LangChain Chat 类"""
+    cls = _PROVIDER_CLASSES.get(llm_type)
+    if cls is not None:
+        return cls
+
+    if llm_type == "ollama":
+        from langchain_ollama import ChatOllama
+        cls = ChatOllama
+    elif llm_type == "openai":
+        from langchain_openai import ChatOpenAI
+        cls = ChatOpenAI
+    else:
+        raise ValueError(f"不支持的 LLM 类型: {llm_type}")
+
+    _PROVIDER_CLASSES[llm_type] = cls
+    return cls
 
 
 class LLMService:
@@ -22,9 +59,23 @@ class LLMService:
     def _load_config(self) -> Dict[str, Any]:
         if not self.config_path.exists():
             raise FileNotFoundError(f"配置文件未找到: {self.config_path.absolute()}")
-        
-        with open(self.config_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+
+        cache_key = (str(self.config_path.resolve()), self.config_path.stat().st_mtime)
+        cached = _CONFIG_CACHE.get(cache_key)
+        if cached is not None:
+            # _process_config 不会修改原配置，这里直接返回缓存对象即可
+            return cached
+
+        # 注意：orjson 没有流式 load，只能整块读取字节后解析 (整体仍比标准库快)；
+        # 回退到标准库时保持 json.load(f) 文件对象形式，不要改成 json.loads(f.read())
+        if ORJSON_AVAILABLE:
+            with open(self.config_path, 'rb') as f:
+                config = orjson.loads(f.read())
+        else:
+            with open(self.config_path, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+        _CONFIG_CACHE[cache_key] = config
+        return config
 
     def _process_config(self, provider_name: str) -> Dict[str, Any]:
         """提取指定 Provider 的配置并处理环境变量"""
@@ -35,25 +86,39 @@ class LLMService:
             valid_keys = list(providers.keys())
             raise ValueError(f"未找到 Provider '{provider_name}' 的配置。可用选项: {valid_keys}")
 
-        # 深拷贝以防修改原字典
-        config = copy.deepcopy(provider_config)
-        
+        # 常见情况：没有环境变量占位符，调用方只读，直接返回原配置
+        api_key = provider_config.get("api_key")
+        match = _ENV_VAR_RE.match(api_key) if isinstance(api_key, str) else None
+        if match is None:
+            return provider_config
+
+        # 浅拷贝以防修改原字典 (配置值均为字符串/数字，无需深拷贝)
+        config = dict(provider_config)
+
         # 替换环境变量占位符
-        api_key = config.get("api_key")
-        if isinstance(api_key, str) and api_key.startswith("${") and api_key.endswith("}"):
-            env_var = api_key[2:-1]
-            real_key = os.getenv(env_var)
-            if not real_key and config.get("type") == "openai":
-                print(f"⚠️ 警告: 环境变量 {env_var} 未设置，OpenAI 兼容接口可能调用失败")
-            config["api_key"] = real_key
+        env_var = match.group(1)
+        real_key = os.getenv(env_var)
+        if not real_key and config.get("type") == "openai":
+            print(f"⚠️ 警告: 环境变量 {env_var} 未设置，OpenAI 兼容接口可能调用失败")
+        config["api_key"] = real_key
 
         return config
 
-    def create_llm(self, provider_name: str, override_temperature: Optional[float] = None):
+    def get_provider_config(self, provider_name: str) -> Mapping[str, Any]:
+        """获取 Provider 的连接参数 (已替换环境变量)；只读视图，与缓存的配置共享数据，调用方不能修改"""
+        return MappingProxyType(self._process_config(provider_name))
+
+    def create_llm(self, provider_name: str, override_temperature: Optional[float] = None,
+                   output_format: Optional[Any] = None, max_tokens: Optional[int] = None,
+                   http_client: Optional[Any] = None):
         """
         根据 provider_name 创建 LangChain 实例
         :param provider_name: 对应配置文件中 providers 下的 key (如 "Ollama", "DeepSeek")
         :param override_temperature: 可选，覆盖配置文件中的温度
+        :param output_format: 可选，Ollama 结构化输出约束 ("json" 或 JSON Schema dict)，其他类型忽略
+        :param max_tokens: 可选，限制单次生成的 token 数 (Ollama 对应 num_predict)，用于连通性测试等只需短回复的场景
+        :param http_client: 可选，多个实例共享的 httpx.Client (连接池)，仅 openai 兼容接口支持；
+                            Ollama 客户端不接受外部连接池，同一实例内部已复用连接
         """
         conf = self._process_config(provider_name)
         
@@ -63,28 +128,68 @@ class LLMService:
 
         print(f"🔄 初始化 LLM: Provider=[{provider_name}] Type=[{llm_type}] Model=[{model_name}]")
 
+        chat_cls = _get_provider_class(llm_type)
+
         if llm_type == "ollama":
-            from langchain_ollama import ChatOllama
-            return ChatOllama(
+            extra = {"format": output_format} if output_format is not None else {}
+            if max_tokens is not None:
+                extra["num_predict"] = max_tokens
+            return chat_cls(
                 base_url=conf.get("base_url", "http://localhost:11434"),
                 model=model_name,
-                temperature=temperature
-            )
-        
-        elif llm_type == "openai":
-            from langchain_openai import ChatOpenAI
-
-            return ChatOllama(
-                base_url=conf.get("base_url"),
-                model=model_name,
                 temperature=temperature,
-                # format="json",  # 强制 Ollama 输出 JSON (需模型支持，如 Llama3, Mistral)
-                num_predict=200, # 限制最大 token 数，防止 100s 的生成
+                keep_alive=-1,  # 模型常驻内存，保留静态 Prompt 前缀的 KV Cache
+                **extra
             )
 
+        # openai 兼容接口 (如 DeepSeek)
+        extra = {"max_tokens": max_tokens} if max_tokens is not None else {}
+        if http_client is not None:
+            extra["http_client"] = http_client
+        return chat_cls(
+            base_url=conf.get("base_url"),
+            api_key=conf.get("api_key"),
+            model=model_name,
+            temperature=temperature,
+            **extra
+        )
 
-        else:
-            raise ValueError(f"不支持的 LLM 类型: {llm_type}")
+    def warm_up_prefix(self, llm, messages) -> bool:
+        """
+        预热静态 Prompt 前缀：用同样的前缀请求一次并只生成 1 个 token，
+        让 Ollama 提前为这段前缀建立 KV Cache，首条真实请求即可直接复用。
+        :param llm: create_llm 返回的实例 (仅 ollama 类型生效)
+        :param messages: 只包含静态部分的消息 (如 System Prompt)
+        :return: 是否完成预热
+        """
+        ollama_cls = _PROVIDER_CLASSES.get("ollama")
+        if ollama_cls is None or not isinstance(llm, ollama_cls):
+            return False
+
+        try:
+            # 拷贝一份仅修改 num_predict，模型、上下文长度等参数保持一致，保证前缀可被复用
+            llm.model_copy(update={"num_predict": 1}).invoke(messages)
+            return True
+        except Exception as e:
+            print(f"⚠️ Prompt 前缀预热失败 (不影响后续调用): {e}")
+            return False
+
+    def create_embeddings(self, provider_name: str = "Ollama", model_name: str = "all-minilm"):
+        """
+        创建 Embedding 实例 (目前仅支持 ollama 类型，用于语义缓存等场景)
+        :param provider_name: 对应配置文件中 providers 下的 key
+        :param model_name: Ollama 中的 embedding 模型名 (all-minilm 即 sentence-transformers/all-MiniLM-L6-v2)
+        """
+        conf = self._process_config(provider_name)
+        llm_type = conf.get("type", "").lower()
+        if llm_type != "ollama":
+            raise ValueError(f"Embedding 暂不支持的 LLM 类型: {llm_type}")
+
+        from langchain_ollama import OllamaEmbeddings
+        return OllamaEmbeddings(
+            base_url=conf.get("base_url", "http://localhost:11434"),
+            model=model_name
+        )
 
 if __name__ == "__main__":
     # 自测
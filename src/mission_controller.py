@@ -2,14 +2,87 @@
 import time
 import json
 import os
-from datetime import datetime
+import logging
+import atexit
+import concurrent.futures
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
 from typing import Dict, Any
 from uav_executor import UAVExecutor
 from llm_service import LLMService
+from llm_cache import SemanticLLMCache
+from json_repair import parse_json_lenient, StreamingJSONExtractor
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import JsonOutputParser
-# 引入基础消息类型以处理不同 LLM 的返回
-from langchain_core.messages import BaseMessage
+
+logger = logging.getLogger("MissionController")
+
+# orjson 为可选依赖，未安装时回退到标准库 json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+@contextmanager
+def _timed(store: Dict[str, Any]):
+    """统计代码块耗时，写入 store["latency_seconds"] (异常时同样记录)"""
+    t0 = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        store["latency_seconds"] = (time.perf_counter_ns() - t0) / 1e9
+
+
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+# 探索策略输出必须包含的坐标字段
+_MOVE_KEYS = {"x", "y", "z"}
+
+# Ollama 原生结构化输出约束 (与容错解析互为保障)
+_MOVE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "x": {"type": "number"},
+        "y": {"type": "number"},
+        "z": {"type": "number"},
+    },
+    "required": ["x", "y", "z"],
+}
+
+
+def _is_valid_move(obj: Any) -> bool:
+    """探索策略输出必须是包含 x/y/z 且均为数值的对象 (容错修复可能补出 None)"""
+    return isinstance(obj, dict) and all(
+        isinstance(obj.get(k), (int, float)) and not isinstance(obj.get(k), bool) for k in _MOVE_KEYS
+    )
+
+
+def _quantize_status(status: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    量化状态用于渲染 Prompt：位置取整到 1m 网格，电量按 5% 分桶。
+    使细微差异的状态得到完全相同的 Prompt 文本，从而命中精确缓存。
+    """
+    quantized = dict(status)
+    pos = status.get("position")
+    if isinstance(pos, dict):
+        quantized["position"] = {
+            k: round(v) if isinstance(v, (int, float)) else v for k, v in pos.items()
+        }
+    for key in ("battery", "battery_level"):
+        value = status.get(key)
+        if isinstance(value, (int, float)):
+            quantized[key] = int(value // 5 * 5)
+    return quantized
+
+
+def _to_json_str(obj: Any) -> str:
+    """将状态字典序列化为 Prompt 中使用的紧凑 JSON 文本"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, ensure_ascii=False)
+
 
 class MissionController:
     def __init__(self, drone_id: str = "487bc0b6"):
@@ -20,72 +93,117 @@ class MissionController:
         
         # 2. 初始化大脑 (LLM)
         llm_svc = LLMService()
-        self.llm = llm_svc.create_llm("Ollama", override_temperature=0.1) 
+        self.llm = llm_svc.create_llm("Ollama", override_temperature=0.1, output_format=_MOVE_SCHEMA)
+
+        # 探索策略的语义缓存：悬停/状态几乎不变时直接复用上次决策，跳过 LLM 调用
+        self._llm_cache = SemanticLLMCache(llm_svc.create_embeddings("Ollama"))
         
         self.mission_completed = False
 
+        # 避障指令的冷却时间：状态按短周期轮询，障碍物持续上报期间不重复下发 avoid_obstacle，
+        # 等上一次避障动作完成 (约 1 秒) 后再判断是否需要继续避障
+        self.avoid_cooldown = 1.0
+        self._avoid_until = 0.0
+
+        # 事件位 -> 处理函数 (见 run() 中的 flags)
+        self._priority_handlers = {
+            1: self._on_low_battery,
+            2: self._on_mission_completed,
+            4: self._on_obstacle,
+            8: self._on_target,
+        }
+
+        # 3. 预编译探索策略的 Prompt，循环内直接复用
+        self._prompt_template_str = """
+            你是一个无人机任务规划助手。
+            当前无人机状态: {status}
+            当前位置: {position}
+            
+            请分析当前情况，给出一个下一步探索的坐标 (x, y, z)。
+            只返回 JSON 格式，例如: {{"x": 10, "y": 20, "z": 5}}
+            不要包含其他废话。
+        """
+        self._prompt = ChatPromptTemplate.from_template(self._prompt_template_str)
+
         # --- 日志系统初始化 ---
         self.llm_conversation_count = 0
         current_time_str = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.log_dir = os.path.join("llm_logs", current_time_str)
         
-        if not os.path.exists(self.log_dir):
-            os.makedirs(self.log_dir)
-            print(f"📁 LLM 日志目录已创建: {self.log_dir}")
+        os.makedirs(self.log_dir, exist_ok=True)
+        self._log_dir_path = Path(self.log_dir)
+        print(f"📁 LLM 日志目录已创建: {self.log_dir}")
+
+        # 所有对话追加写入同一个 JSONL 文件 (每行一条)，避免每轮新建文件
+        self._log_fh = open(self._log_dir_path / "dialogues.jsonl", "ab", buffering=64 * 1024)
+        atexit.register(self._log_fh.close)
+
+        # 日志写盘放到后台单线程执行，避免阻塞决策循环；退出时等待队列写完
+        # (atexit 逆序执行：先等待线程池写完，再关闭文件)
+        self._log_pool = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="llmlog")
+        atexit.register(self._log_pool.shutdown, wait=True)
 
     def run(self):
         print(f"🚀 任务开始: {self.drone_id}")
 
-        if not self._check_ready():
+        if not self._check_ready(self._get_status()):
             print("❌ 无人机未就绪，中止任务")
             return
 
         self.executor.execute("take_off", {"drone_id": self.drone_id, "altitude": 10})
         time.sleep(2)
 
+        # 感知轮询与 LLM 决策解耦：状态按短周期轮询 (电量/避障/目标随时响应)，
+        # 只有在连续 explore_period 秒内没有任何事件时才请求一次 LLM 探索策略
+        poll_period = 0.2               # 状态轮询周期 (秒)
+        explore_period = 1.0            # 两次 LLM 探索决策的最小间隔 (秒)
+        next_tick = time.monotonic()
+        last_event = time.monotonic()
+
         while True:
+            # 按固定周期节拍运行：只睡剩余时间，上一轮 (LLM/IO) 已超出周期则不再等待
+            sleep_for = next_tick - time.monotonic()
+            if sleep_for > 0:
+                time.sleep(sleep_for)
+            next_tick = max(next_tick, time.monotonic()) + poll_period
+
             # 1. Observe (获取感知数据)
             status = self._get_status()
             if not status:
                 break
             
-            # 2. CheckBattery (优先级 1: 生存)
-            if status.get("battery", 100) < 20:
-                print("🪫 电量不足 (<20%)，触发返航...")
-                self._return_home()
-                break
-
-            # 3. CheckTask (优先级 2: 任务完成)
-            if self.mission_completed: # 这里可以根据 status 判断
-                print("✅ 任务已完成，返航...")
-                self._return_home()
-                break
-
-            # 4. CheckObstacle (优先级 3: 避障 - 必须优先于移动)
-            # 假设 status 里有 obstacle_detected 字段
-            if status.get("obstacle_detected", False):
-                print("🚧 检测到障碍物，执行避障...")
-                self.executor.execute("avoid_obstacle", {"drone_id": self.drone_id, "direction": "right"})
-                time.sleep(1)
+            # 2~5. 按优先级处理事件：先把各项检查打包成位掩码，再取最低位 (优先级最高) 分发
+            # 位 0 电量不足 > 位 1 任务完成 > 位 2 障碍物 > 位 3 发现目标
+            flags = ((status.get("battery", 100) < 20)
+                     | (self.mission_completed << 1)
+                     | (bool(status.get("obstacle_detected")) << 2)
+                     | (bool(status.get("visual_targets")) << 3))
+            if flags:
+                # 处理函数返回 True 表示任务结束，退出循环
+                if self._priority_handlers[flags & -flags](status):
+                    break
+                last_event = time.monotonic()
                 continue
 
-            # 5. CheckTarget (优先级 4: 发现目标)
-            # 模拟：假设 status 里有 visual_targets
-            targets = status.get("visual_targets", [])
-            if targets:
-                print(f"🎯 发现目标: {targets}，执行接近...")
-                self.executor.execute("move_to", {"drone_id": self.drone_id, "position": targets[0]['pos']})
-                self.executor.execute("record_data", {"target_id": targets[0]['id']})
-                self.mission_completed = True # 假设发现即完成
+            # 6. ExploreStrategy (优先级 5: 默认探索)
+            # 事件平息不足 explore_period 秒时继续轮询，合并 LLM 调用而不是每拍都请求
+            if time.monotonic() - last_event < explore_period:
                 continue
+            last_event = time.monotonic()
 
-            # 6. ExploreStrategy (优先级 5: 默认探索)
             # === 这里我们引入 LLM 做决策 ===
-            print("🧭 无特定事件，请求 LLM 生成探索策略...")
+            logger.info("🧭 无特定事件，请求 LLM 生成探索策略...")
             next_move = self._ask_llm_for_strategy(status)
             
             if next_move:
-                print(f"🤖 LLM 建议移动至: {next_move}")
+                # 目标坐标与当前位置相同 (包括解析失败时的原地不动降级策略)，无需发送 move_to
+                current_pos = status.get("position", {"x": 0, "y": 0, "z": 0})
+                target = (next_move.get("x"), next_move.get("y"), next_move.get("z"))
+                if target == (current_pos.get("x"), current_pos.get("y"), current_pos.get("z")):
+                    print("⏸️ LLM 建议保持原地，跳过移动指令")
+                    continue
+
+                logger.info("🤖 LLM 建议移动至: %s", next_move)
                 move_params = {
                     "drone_id": self.drone_id,
                     "x": next_move.get("x"),
@@ -93,20 +211,47 @@ class MissionController:
                     "z": next_move.get("z")
                 }
                 self.executor.execute("move_to", move_params)
-            
-            time.sleep(1) # 模拟循环间隔
 
-    def _check_ready(self) -> bool:
-        """检查无人机是否就绪"""
-        res = self.executor.execute("get_drone_status", {"drone_id": self.drone_id})
-        return res["success"] and res["data"].get("state") != "error"
+    def _on_low_battery(self, status: Dict[str, Any]) -> bool:
+        """优先级 1: 生存"""
+        print("🪫 电量不足 (<20%)，触发返航...")
+        self._return_home()
+        return True
+
+    def _on_mission_completed(self, status: Dict[str, Any]) -> bool:
+        """优先级 2: 任务完成 (这里可以根据 status 判断)"""
+        print("✅ 任务已完成，返航...")
+        self._return_home()
+        return True
+
+    def _on_obstacle(self, status: Dict[str, Any]) -> bool:
+        """优先级 3: 避障 - 必须优先于移动 (假设 status 里有 obstacle_detected 字段)"""
+        now = time.monotonic()
+        if now < self._avoid_until:
+            # 上一次避障仍在执行，本轮只保持事件状态 (不进入探索)，不重复下发
+            return False
+        print("🚧 检测到障碍物，执行避障...")
+        self.executor.execute("avoid_obstacle", {"drone_id": self.drone_id, "direction": "right"})
+        self._avoid_until = now + self.avoid_cooldown
+        return False
+
+    def _on_target(self, status: Dict[str, Any]) -> bool:
+        """优先级 4: 发现目标 (模拟：假设 status 里有 visual_targets)"""
+        targets = status["visual_targets"]
+        print(f"🎯 发现目标: {targets}，执行接近...")
+        self.executor.execute("move_to", {"drone_id": self.drone_id, "position": targets[0]['pos']})
+        self.executor.execute("record_data", {"target_id": targets[0]['id']})
+        self.mission_completed = True # 假设发现即完成
+        return False
+
+    def _check_ready(self, status: Dict[str, Any]) -> bool:
+        """检查无人机是否就绪 (复用调用方已获取的状态，不再单独请求)"""
+        return bool(status) and status.get("state") != "error"
 
     def _get_status(self) -> Dict[str, Any]:
         """获取当前综合状态"""
         res = self.executor.execute("get_drone_status", {"drone_id": self.drone_id})
-        if res["success"]:
-            return res["data"]
-        return {}
+        return res.data if res.success else {}
 
     def _return_home(self):
         self.executor.execute("return_home", {"drone_id": self.drone_id})
@@ -118,99 +263,114 @@ class MissionController:
         """
         self.llm_conversation_count += 1
         
-        prompt_template = """
-            你是一个无人机任务规划助手。
-            当前无人机状态: {status}
-            当前位置: {position}
-            
-            请分析当前情况，给出一个下一步探索的坐标 (x, y, z)。
-            只返回 JSON 格式，例如: {{"x": 10, "y": 20, "z": 5}}
-            不要包含其他废话。
-        """
-        
-        prompt = ChatPromptTemplate.from_template(prompt_template)
-        parser = JsonOutputParser()
-        chain = prompt | self.llm | JsonOutputParser()
-        
+        prompt = self._prompt
+
         current_pos = current_status.get("position", {"x": 0, "y": 0, "z": 0})
-        
+        quantized_status = _quantize_status(current_status)
+
         input_vars = {
-            "status": str(current_status), 
-            "position": str(current_pos)
+            "status": _to_json_str(quantized_status),
+            "position": _to_json_str(quantized_status.get("position", current_pos))
         }
 
         # 初始化日志结构，新增 raw_response 字段
         log_entry = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp_ns": time.time_ns(), # 整数纳秒时间戳，可读时间在后台写日志时再格式化
             "dialogue_id": self.llm_conversation_count,
-            "prompt_template": prompt_template,
+            "prompt_template": self._prompt_template_str,
             "inputs": input_vars,
             "raw_response": None, # 新增：原始的大模型返回字符串
             "parsed_output": None, # 修改：解析后的 JSON 对象
             "success": False,
             "error_message": None,
-            "latency_seconds": 0.0
+            "latency_seconds": 0.0,
+            "cache_hit": False
         }
 
+        # Step 1: 生成 Prompt (仅用于内部逻辑，LangChain会自动处理，这里主要是为了生成给 LLM)
+        # chain_step_1 = prompt | self.llm
+        # response = chain_step_1.invoke(input_vars)
+        messages = prompt.invoke(input_vars)
+        prompt_text = messages.to_string()
+
+        # 先查语义缓存，命中则直接复用之前的决策，跳过 LLM 调用
+        # 缓存的是绝对目标坐标，只能在同一 (量化) 位置复用，位置作为缓存 key 的一部分
+        quantized_pos = quantized_status.get("position", current_pos)
+        cache_key = tuple(quantized_pos.get(axis) for axis in ("x", "y", "z"))
+        cached = self._llm_cache.get(prompt_text, cache_key)
+        if cached is not None:
+            log_entry["cache_hit"] = True
+            log_entry["parsed_output"] = cached
+            log_entry["success"] = True
+            self._log_pool.submit(self._save_llm_log, log_entry)
+            return cached
+
         result = None
-        start_time = time.time()
+        with _timed(log_entry):
+            try:
+                # 更底层的写法，确保我们拿到 raw response
+                # 流式接收：每个分片直接喂给增量提取器 (只扫描新文本)，
+                # 顶层 JSON 对象一闭合且包含 x/y/z 就退出流 (关闭连接，Ollama 随即停止生成)，省去模型尾部的多余输出
+                extractor = StreamingJSONExtractor()
+                parsed_result = None
+                for chunk in self.llm.stream(messages):
+                    candidate = extractor.feed(chunk.content)
+                    if _is_valid_move(candidate):
+                        parsed_result = candidate
+                        break
+                raw_content = extractor.text
 
-        try:
-            # Step 1: 生成 Prompt (仅用于内部逻辑，LangChain会自动处理，这里主要是为了生成给 LLM)
-            # chain_step_1 = prompt | self.llm
-            # response = chain_step_1.invoke(input_vars)
-            
-            # 更底层的写法，确保我们拿到 raw response
-            messages = prompt.invoke(input_vars)
-            response = self.llm.invoke(messages)
-            
-            # 提取原始文本内容
-            raw_content = ""
-            if isinstance(response, BaseMessage):
-                raw_content = response.content
-            else:
-                raw_content = str(response)
-            
-            # 【关键】保存原始输出，即使后面解析失败也能看到这里的内容
-            log_entry["raw_response"] = raw_content
+                # 【关键】保存原始输出，即使后面解析失败也能看到这里的内容
+                log_entry["raw_response"] = raw_content
 
-            # Step 2: 尝试解析 JSON
-            # JsonOutputParser 可以容忍一定程度的 markdown 代码块 (```json ... ```)
-            parsed_result = parser.parse(raw_content)
-            
-            # 记录成功结果
-            log_entry["parsed_output"] = parsed_result
-            log_entry["success"] = True
-            result = parsed_result
+                # Step 2: 流式阶段未能提前解析时，解析完整输出
+                # 快速路径：模型直接返回了纯 JSON，直接解析
+                # 失败再做容错修复 (Markdown 代码块、多余逗号、Python 字面量、被截断的括号等)，避免无谓的降级
+                if parsed_result is None:
+                    try:
+                        parsed_result = _json_loads(raw_content)
+                    except (ValueError, TypeError):
+                        parsed_result = parse_json_lenient(raw_content)
 
-        except Exception as e:
-            error_msg = str(e)
-            print(f"⚠️ LLM 思考或解析失败: {error_msg}")
+                # 截断的输出会被修复成 {"x": 1, "y": null} 之类，坐标不完整时按解析失败处理
+                if not _is_valid_move(parsed_result):
+                    log_entry["parsed_output"] = parsed_result
+                    raise ValueError(f"LLM 输出缺少有效的 x/y/z 坐标: {parsed_result!r}")
+
+                # 记录成功结果
+                log_entry["parsed_output"] = parsed_result
+                log_entry["success"] = True
+                result = parsed_result
+                self._llm_cache.set(prompt_text, cache_key, parsed_result)
+
+            except Exception as e:
+                error_msg = str(e)
+                print(f"⚠️ LLM 思考或解析失败: {error_msg}")
             
-            # 即使解析失败，raw_response 应该已经在上面被赋值了（如果是解析错误）
-            # 如果是 LLM 调用本身的 timeout 网络错误，raw_response 可能为空
+                # 即使解析失败，raw_response 应该已经在上面被赋值了（如果是解析错误）
+                # 如果是 LLM 调用本身的 timeout 网络错误，raw_response 可能为空
             
-            log_entry["error_message"] = error_msg
-            log_entry["success"] = False
+                log_entry["error_message"] = error_msg
+                log_entry["success"] = False
             
-            # 降级策略：原地不动或微小移动
-            result = {"x": current_pos["x"], "y": current_pos["y"], "z": current_pos["z"]}
+                # 降级策略：原地不动或微小移动
+                result = {"x": current_pos["x"], "y": current_pos["y"], "z": current_pos["z"]}
 
-        finally:
-            # 4. 计算耗时并保存日志
-            end_time = time.time()
-            log_entry["latency_seconds"] = round(end_time - start_time, 4)
-            self._save_llm_log(log_entry)
+        # 4. 保存日志 (耗时已由 _timed 写入 log_entry)
+        self._log_pool.submit(self._save_llm_log, log_entry)
 
         return result
 
     def _save_llm_log(self, log_data: Dict):
-        filename = f"{self.llm_conversation_count:03d}_dialogue.json"
-        file_path = os.path.join(self.log_dir, filename)
-        
         try:
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(log_data, f, ensure_ascii=False, indent=4)
+            log_data["timestamp"] = datetime.fromtimestamp(log_data["timestamp_ns"] / 1e9, tz=timezone.utc).isoformat()
+            if ORJSON_AVAILABLE:
+                line = orjson.dumps(log_data, option=orjson.OPT_NON_STR_KEYS)
+            else:
+                line = json.dumps(log_data, ensure_ascii=False).encode("utf-8")
+            # 每条记录写完立即 flush (已在后台线程中，不阻塞决策循环)，崩溃或 Ctrl-C 时不丢失最近的对话
+            self._log_fh.write(line + b"\n")
+            self._log_fh.flush()
         except Exception as e:
             print(f"❌ 写入 LLM 日志失败: {e}")
 
@@ -3,14 +3,83 @@ import time
 import json
 import os
 import sys
-from datetime import datetime
+import atexit
+import concurrent.futures
+import itertools
+import asyncio
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from llm_service import LLMService
 from context_manager import DroneContextManager 
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
-from langchain_core.messages import BaseMessage
+
+# orjson 为可选依赖，未安装时回退到标准库 json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+# 日志写盘放到后台单线程执行，避免阻塞指令解析；退出时等待队列写完
+_LOG_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="llmlog")
+atexit.register(_LOG_POOL.shutdown, wait=True)
+
+
+def _append_log_line(file_path: Path, log_data: Dict):
+    """在后台线程中格式化时间、序列化并追加写入一行 JSONL"""
+    try:
+        log_data["timestamp"] = datetime.fromtimestamp(log_data["timestamp_ns"] / 1e9, tz=timezone.utc).isoformat()
+        if ORJSON_AVAILABLE:
+            line = orjson.dumps(log_data, option=orjson.OPT_NON_STR_KEYS)
+        else:
+            line = json.dumps(log_data, ensure_ascii=False).encode("utf-8")
+        with open(file_path, "ab") as f:
+            f.write(line + b"\n")
+    except Exception as e:
+        print(f"❌ 写入日志失败: {e}")
+
+
+# === 核心 Prompt 设计 ===
+# 静态部分 (规则 + API 定义 + 输出示例) 放在最前面且保持不变，
+# 动态部分 (环境上下文 + 用户指令) 放在最后，
+# 使 Ollama 每次调用都能复用静态前缀的 KV Cache，只需对末尾少量 token 做 prefill。
+SYSTEM_PROMPT_STATIC = """
+你是一个无人机编队控制中枢。将用户的自然语言指令转换为标准 JSON 控制序列。
+
+### 关键规则
+1. **ID 匹配**: 必须根据用户消息中的 [环境上下文] 将自然语言名称（如 "Drone 1"）转换为真实的 UUID。
+2. **格式限制**: 仅输出 JSON 对象，**不要**包含 Markdown (```json) 标记或额外解释。
+
+### API 接口定义
+支持的函数 (func) 及参数 (params):
+1. 动作类:
+- take_off(drone_id: str, altitude: float)
+- move_to(drone_id: str, x: float, y: float, z: float)
+- land(drone_id: str)
+- return_home(drone_id: str)
+- take_photo(drone_id: str)
+2. 查询类:
+- list_drones()
+- get_drone_status(drone_id: str)
+
+### 输出 JSON 结构示例
+{{
+    "mission_steps": [
+        {{ "func": "take_off", "params": {{ "drone_id": "uav_uuid_here", "altitude": 10 }} }},
+        {{ "func": "move_to", "params": {{ "drone_id": "uav_uuid_here", "x": 10, "y": 20, "z": 10 }} }}
+    ]
+}}
+"""
+
+USER_PROMPT_DYNAMIC = """### 环境上下文 (Name -> UUID 映射)
+{drone_context_str}
+### 用户指令
+"{user_input}"
+"""
+
 
 class NaturalLanguageCommander:
     def __init__(self, context_manager):
@@ -25,21 +94,60 @@ class NaturalLanguageCommander:
         # 使用较低的 temperature (0.1) 以保证指令解析的稳定性
         llm_svc = LLMService()
         self.llm = llm_svc.create_llm("Ollama", override_temperature=0.0) 
+
+        # 预编译 Prompt 与 Parser，每次解析直接复用
+        self.prompt = ChatPromptTemplate.from_messages([
+            ("system", SYSTEM_PROMPT_STATIC),
+            ("user", USER_PROMPT_DYNAMIC),
+        ])
+        self.parser = JsonOutputParser()
+        # Parser 单独调用，以便在日志中保留原始输出
+        self.chain = self.prompt | self.llm
+
+        # 启动时预热静态前缀 (规则 + API 定义)，首条指令也能命中 KV Cache
+        static_messages = ChatPromptTemplate.from_messages([("system", SYSTEM_PROMPT_STATIC)]).invoke({})
+        llm_svc.warm_up_prefix(self.llm, static_messages)
         
         # === 3. 日志系统初始化 ===
-        self.llm_conversation_count = 0
+        self._dialogue_counter = itertools.count(1)
         current_time_str = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.log_dir = os.path.join("llm_logs", "nlp_commands", current_time_str)
         
-        if not os.path.exists(self.log_dir):
-            os.makedirs(self.log_dir)
-            print(f"📁 NLP 指令日志目录已创建: {self.log_dir}")
+        os.makedirs(self.log_dir, exist_ok=True)
+        print(f"📁 NLP 指令日志目录已创建: {self.log_dir}")
+        # 所有对话追加写入同一个 JSONL 文件 (每行一条)，避免每轮新建文件
+        self._log_file = Path(self.log_dir) / "dialogues.jsonl"
 
     def parse_instruction(self, text_command: str) -> Dict[str, Any]:
         """
         将自然语言文本解析为标准化的控制命令序列
         """
-        self.llm_conversation_count += 1
+        input_vars, log_entry = self._prepare(text_command)
+        start_time = time.perf_counter()
+        try:
+            # Step D: 调用 LLM
+            response = self.chain.invoke(input_vars)
+        except Exception as e:
+            return self._finish(None, log_entry, start_time, error=e)
+        return self._finish(response, log_entry, start_time)
+
+    async def parse_instruction_async(self, text_command: str) -> Dict[str, Any]:
+        """
+        parse_instruction 的协程版本 (使用 LangChain 的 ainvoke)，
+        多条指令可通过 asyncio.gather 并发解析。
+        """
+        input_vars, log_entry = self._prepare(text_command)
+        start_time = time.perf_counter()
+        try:
+            response = await self.chain.ainvoke(input_vars)
+        except Exception as e:
+            return self._finish(None, log_entry, start_time, error=e)
+        return self._finish(response, log_entry, start_time)
+
+    def _prepare(self, text_command: str) -> Tuple[Dict[str, str], Dict[str, Any]]:
+        """Step A~C: 准备 Prompt 变量与日志结构"""
+        # itertools.count 的 next() 是原子操作，并发解析时编号不会重复
+        dialogue_id = next(self._dialogue_counter)
         
         # === Step A: 获取最新的环境上下文 ===
         # 在每次解析前，获取当前最新的 "名称 -> ID" 映射字符串
@@ -50,43 +158,7 @@ class NaturalLanguageCommander:
         if "没有检测到" in current_context_str:
             print("⚠️ 警告: 当前环境中没有检测到在线无人机，生成的指令可能缺乏有效 ID。")
 
-        # === Step B: 核心 Prompt 设计 ===
-        prompt_template = """
-        你是一个无人机编队控制中枢。将用户的自然语言指令转换为标准 JSON 控制序列。
-
-        ### 关键规则
-        1. **ID 匹配**: 必须根据下面的 [环境上下文] 将自然语言名称（如 "Drone 1"）转换为真实的 UUID。
-        2. **格式限制**: 仅输出 JSON 对象，**不要**包含 Markdown (```json) 标记或额外解释。
-        
-        ### 环境上下文 (Name -> UUID 映射)
-        {drone_context_str}
-
-        ### API 接口定义
-        支持的函数 (func) 及参数 (params):
-        1. 动作类:
-        - take_off(drone_id: str, altitude: float)
-        - move_to(drone_id: str, x: float, y: float, z: float)
-        - land(drone_id: str)
-        - return_home(drone_id: str)
-        - take_photo(drone_id: str)
-        2. 查询类:
-        - list_drones()
-        - get_drone_status(drone_id: str)
-
-        ### 用户指令
-        "{user_input}"
-
-        ### 输出 JSON 结构示例
-        {{
-            "mission_steps": [
-                {{ "func": "take_off", "params": {{ "drone_id": "uav_uuid_here", "altitude": 10 }} }},
-                {{ "func": "move_to", "params": {{ "drone_id": "uav_uuid_here", "x": 10, "y": 20, "z": 10 }} }}
-            ]
-        }}
-        """
-        
-        prompt = ChatPromptTemplate.from_template(prompt_template)
-        parser = JsonOutputParser()
+        # === Step B: Chain / Parser 已在 __init__ 中预编译 ===
         
         # === Step C: 注入变量 (包含上下文和用户输入) ===
         input_vars = {
@@ -96,8 +168,8 @@ class NaturalLanguageCommander:
 
         # 初始化日志结构
         log_entry = {
-            "timestamp": datetime.now().isoformat(),
-            "dialogue_id": self.llm_conversation_count,
+            "timestamp_ns": time.time_ns(), # 整数纳秒时间戳，可读时间在后台写日志时再格式化
+            "dialogue_id": dialogue_id,
             "input_text": text_command,
             "context_used": current_context_str, # 记录当时使用了什么上下文
             "raw_response": None,
@@ -107,22 +179,26 @@ class NaturalLanguageCommander:
             "latency_seconds": 0.0
         }
 
-        result = {"mission_steps": []}
-        start_time = time.time()
-
         print(f"🔄 正在解析指令: \"{text_command}\" ...")
+        return input_vars, log_entry
+
+    def _finish(self, response: Any, log_entry: Dict[str, Any], start_time: float,
+                error: Optional[Exception] = None) -> Dict[str, Any]:
+        """Step E: 解析 LLM 输出、记录日志并返回标准化结果"""
+        result = {"mission_steps": []}
 
         try:
-            # Step D: 调用 LLM
-            messages = prompt.invoke(input_vars)
-            response = self.llm.invoke(messages)
-            
+            if error is not None:
+                raise error
+
             # 提取原始文本
-            raw_content = response.content if isinstance(response, BaseMessage) else str(response)
+            raw_content = getattr(response, "content", None)
+            if raw_content is None:
+                raw_content = str(response)
             log_entry["raw_response"] = raw_content
 
             # Step E: 解析 JSON
-            parsed_result = parser.parse(raw_content)
+            parsed_result = self.parser.parse(raw_content)
             
             # 简单的格式标准化
             if isinstance(parsed_result, list):
@@ -145,20 +221,14 @@ class NaturalLanguageCommander:
             log_entry["success"] = False
 
         finally:
-            end_time = time.time()
-            log_entry["latency_seconds"] = round(end_time - start_time, 4)
+            log_entry["latency_seconds"] = round(time.perf_counter() - start_time, 4)
             self._save_llm_log(log_entry)
 
         return result
 
     def _save_llm_log(self, log_data: Dict):
-        filename = f"{self.llm_conversation_count:03d}_nlp_parse.json"
-        file_path = os.path.join(self.log_dir, filename)
-        try:
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(log_data, f, ensure_ascii=False, indent=4)
-        except Exception as e:
-            print(f"❌ 写入日志失败: {e}")
+        """写盘 (含时间格式化与序列化) 交给后台线程，log_data 提交后不再修改"""
+        _LOG_POOL.submit(_append_log_line, self._log_file, log_data)
 
     def execute_parsed_mission(self, parsed_data: Dict):
         """
@@ -229,15 +299,17 @@ if __name__ == "__main__":
         "Make Drone 1 fly to (100, 200, 50) and then take a photo",
     ]
 
-    for cmd in test_commands:
+    # 各条指令相互独立：并发解析 (总耗时约等于最慢的一条)，再按原顺序依次执行
+    async def parse_all(commands):
+        return await asyncio.gather(*(commander.parse_instruction_async(c) for c in commands))
+
+    parsed_missions = asyncio.run(parse_all(test_commands))
+
+    for cmd, parsed_mission in zip(test_commands, parsed_missions):
         print(f"\n🗣️  指令: {cmd}")
         
-        # 解析
-        parsed_mission = commander.parse_instruction(cmd)
-        
         # 打印原始 JSON (Debug)
         # print(json.dumps(parsed_mission, indent=2, ensure_ascii=False))
         
         # 执行
         commander.execute_parsed_mission(parsed_mission)
-        time.sleep(1)
\ No newline at end of file
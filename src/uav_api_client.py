@@ -2,13 +2,26 @@
 UAV API Client
 Wrapper for the UAV Control System API to simplify drone operations
 """
+import threading
 import requests
-from typing import Dict, List, Any, Optional
+from requests.adapters import HTTPAdapter
+from typing import ClassVar, Dict, List, Any, Optional
+
+
+class UAVAPIError(Exception):
+    """Raised when an API request fails (HTTP error, authentication/permission error or connection problem)"""
 
 
 class UAVAPIClient:
     """Client for interacting with the UAV Control System API"""
 
+    # Shared HTTP session (keep-alive connection pool) for all client instances,
+    # created lazily on first request
+    _session: ClassVar[Optional[requests.Session]] = None
+    _session_lock: ClassVar[threading.Lock] = threading.Lock()
+    # Matches AsyncMissionExecutor max_concurrency so concurrent calls do not discard pooled connections
+    _POOL_SIZE: ClassVar[int] = 16
+
     def __init__(self, base_url: str = "http://localhost:8000", api_key: Optional[str] = None):
         """
         Initialize UAV API Client
@@ -25,6 +38,27 @@ class UAVAPIClient:
         if self.api_key:
             self.headers['X-API-Key'] = self.api_key
 
+    @classmethod
+    def _get_session(cls) -> requests.Session:
+        """Return the shared session, creating it on first use"""
+        if cls._session is None:
+            with cls._session_lock:
+                if cls._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=cls._POOL_SIZE, pool_maxsize=cls._POOL_SIZE)
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    cls._session = session
+        return cls._session
+
+    @classmethod
+    def close_session(cls) -> None:
+        """Close the shared session; the next request opens a new one"""
+        with cls._session_lock:
+            if cls._session is not None:
+                cls._session.close()
+                cls._session = None
+
     def _request(self, method: str, endpoint: str, **kwargs) -> Any:
         """Make HTTP request to the API"""
         url = f"{self.base_url}{endpoint}"
@@ -34,20 +68,20 @@ class UAVAPIClient:
         headers.update(self.headers)
 
         try:
-            response = requests.request(method, url, headers=headers, **kwargs)
+            response = self._get_session().request(method, url, headers=headers, **kwargs)
             response.raise_for_status()
             if response.status_code == 204:
                 return None
             return response.json()
         except requests.exceptions.HTTPError as e:
             if e.response.status_code == 401:
-                raise Exception(f"Authentication failed: Invalid API key")
+                raise UAVAPIError(f"Authentication failed: Invalid API key")
             elif e.response.status_code == 403:
                 error_detail = e.response.json().get('detail', 'Access denied')
-                raise Exception(f"Permission denied: {error_detail}")
-            raise Exception(f"API request failed: {e}")
+                raise UAVAPIError(f"Permission denied: {error_detail}")
+            raise UAVAPIError(f"API request failed: {e}")
         except requests.exceptions.RequestException as e:
-            raise Exception(f"API request failed: {e}")
+            raise UAVAPIError(f"API request failed: {e}")
 
     # Drone Operations
     def list_drones(self) -> List[Dict[str, Any]]:
@@ -1,7 +1,7 @@
 # src\uav_executor.py
 import logging
 import inspect
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, List, Optional, Union, Callable, Tuple
 from uav_api_client import UAVAPIClient
 
 
@@ -9,6 +9,21 @@ from uav_api_client import UAVAPIClient
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("UAVExecutor")
 
+
+class ExecResult:
+    """执行结果 (轻量 __slots__ 对象，替代每次调用都新建的结果字典)"""
+    __slots__ = ("success", "action", "data", "error")
+
+    def __init__(self, success: bool, action: str, data: Any = None, error: Optional[str] = None):
+        self.success = success
+        self.action = action
+        self.data = data  # API 返回的数据
+        self.error = error  # 如果失败，错误信息
+
+    def __repr__(self) -> str:
+        return f"ExecResult(success={self.success}, action={self.action!r}, data={self.data!r}, error={self.error!r})"
+
+
 class UAVExecutor:
     """
     UAV 执行器层 (The "Hand" of the system)。
@@ -30,7 +45,19 @@ class UAVExecutor:
         """
         self.client = UAVAPIClient(base_url)
 
-    def execute(self, func_name: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+        # 一次性反射扫描 Client 的公开方法，构建分发表，避免每次 execute 都做 hasattr/getattr
+        self._dispatch: Dict[str, Callable] = {
+            name: method
+            for name, method in inspect.getmembers(self.client, predicate=inspect.ismethod)
+            if not name.startswith("_")
+        }
+
+        # 预先缓存每个方法的参数签名: {方法名: (必填参数名集合, 全部参数名集合 / 接受 **kwargs 时为 None)}
+        self._signatures: Dict[str, Tuple[frozenset, Optional[frozenset]]] = {
+            name: self._inspect_params(method) for name, method in self._dispatch.items()
+        }
+
+    def execute(self, func_name: str, params: Dict[str, Any] = None) -> ExecResult:
         """
         核心方法：执行具体的动作。
 
@@ -39,13 +66,7 @@ class UAVExecutor:
             params (dict): 传递给方法的参数字典 (例如 {"altitude": 10})
 
         Returns:
-            Dict: 统一格式的结果字典
-            {
-                "success": bool,
-                "action": str,
-                "result": Any,   # API 返回的数据
-                "error": str     # 如果失败，错误信息
-            }
+            ExecResult: 统一格式的结果对象 (success / action / data / error)
         """
         if params is None:
             params = {}
@@ -54,36 +75,45 @@ class UAVExecutor:
         if func_name.startswith("_"):
             return self._format_result(False, func_name, error="Access denied to private methods.")
 
-        # 2. 检查方法是否存在
-        if not hasattr(self.client, func_name):
+        # 2. 检查方法是否存在 (分发表只包含公开方法)
+        func = self._dispatch.get(func_name)
+        if func is None:
             return self._format_result(False, func_name, error=f"Function '{func_name}' not supported by UAV Client.")
 
-        # 3. 获取方法对象
-        func = getattr(self.client, func_name)
-
-        if not callable(func):
-            return self._format_result(False, func_name, error=f"'{func_name}' is a property, not a function.")
+        # 3. 参数预检：根据缓存的签名提前发现缺参/多参，无需等到调用时抛出 TypeError
+        required, accepted = self._signatures[func_name]
+        missing = required - params.keys()
+        if missing:
+            err_msg = f"Argument mismatch: missing required argument(s): {sorted(missing)}"
+            logger.error("❌ Failed: %s", err_msg)
+            return self._format_result(False, func_name, error=err_msg)
+        if accepted is not None:
+            unexpected = params.keys() - accepted
+            if unexpected:
+                err_msg = f"Argument mismatch: unexpected argument(s): {sorted(unexpected)}"
+                logger.error("❌ Failed: %s", err_msg)
+                return self._format_result(False, func_name, error=err_msg)
 
         # 4. 执行调用
         try:
-            logger.info(f"⚡ Executing: {func_name} with params {params}")
+            logger.info("⚡ Executing: %s with params %s", func_name, params)
             
             # 动态解包参数调用
             api_result = func(**params)
             
-            logger.info(f"✅ Success: {func_name}")
+            logger.info("✅ Success: %s", func_name)
             return self._format_result(True, func_name, result=api_result)
 
         except TypeError as e:
             # 捕获参数不匹配错误 (例如少传了参数)
             err_msg = f"Argument mismatch: {str(e)}"
-            logger.error(f"❌ Failed: {err_msg}")
+            logger.error("❌ Failed: %s", err_msg)
             return self._format_result(False, func_name, error=err_msg)
 
         except Exception as e:
             # 捕获 API 通信错误或其他运行时错误
             err_msg = str(e)
-            logger.error(f"❌ API Error: {err_msg}")
+            logger.error("❌ API Error: %s", err_msg)
             return self._format_result(False, func_name, error=err_msg)
 
     def get_available_actions(self) -> List[str]:
@@ -91,20 +121,26 @@ class UAVExecutor:
         获取当前 Client 支持的所有公开方法名称。
         这对于后续让 LLM 知道有哪些工具可用非常重要。
         """
-        methods = []
-        for name, method in inspect.getmembers(self.client, predicate=inspect.ismethod):
-            if not name.startswith("_"):
-                methods.append(name)
-        return methods
-
-    def _format_result(self, success: bool, action: str, result: Any = None, error: str = None) -> Dict[str, Any]:
+        return list(self._dispatch)
+
+    @staticmethod
+    def _inspect_params(method: Callable) -> Tuple[frozenset, Optional[frozenset]]:
+        """提取方法的必填参数名与全部可用参数名 (方法接受 **kwargs 时后者为 None)"""
+        required = set()
+        accepted = set()
+        var_keyword = False
+        for p in inspect.signature(method).parameters.values():
+            if p.kind == inspect.Parameter.VAR_KEYWORD:
+                var_keyword = True
+            elif p.kind in (inspect.Parameter.POSITIONAL_OR_KEYWORD, inspect.Parameter.KEYWORD_ONLY):
+                accepted.add(p.name)
+                if p.default is inspect.Parameter.empty:
+                    required.add(p.name)
+        return frozenset(required), (None if var_keyword else frozenset(accepted))
+
+    def _format_result(self, success: bool, action: str, result: Any = None, error: str = None) -> ExecResult:
         """标准化返回格式"""
-        return {
-            "success": success,
-            "action": action,
-            "data": result,  # 统一叫 data，方便后续解析
-            "error": error
-        }
+        return ExecResult(success, action, result, error)
 
 # ==========================================
 # ==========================================
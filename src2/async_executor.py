@@ -0,0 +1,87 @@
+# src2/async_executor.py
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from src.uav_api_client import UAVAPIClient
+from src2.executor import MissionExecutor
+from src2.schemas import MissionPlan, AgentAction
+from src2.tools_registry import UAVToolRegistry
+
+logger = logging.getLogger("UAVExecutor")
+
+
+class AsyncMissionExecutor(MissionExecutor):
+    """
+    并发任务执行器
+
+    在 MissionExecutor 的基础上按 drone_id 将计划拆分为多条执行链：
+    - 同一架无人机的步骤保持原有顺序串行执行，步骤间按 _wait_between_steps 等待上一条指令完成；
+    - 不同无人机的执行链并发运行，N 架无人机的计划耗时约等于最长的那条链。
+    不带 drone_id 的步骤 (如 list_drones) 归入同一条链，保持它们之间的相对顺序。
+    """
+
+    def __init__(self, client: UAVAPIClient, max_concurrency: int = 16,
+                 registry: Optional[UAVToolRegistry] = None):
+        """
+        Args:
+            client: 初始化的 UAVAPIClient 实例。
+            max_concurrency: 同时在途的请求上限。
+            registry: (可选) 复用已有的工具注册表，见 MissionExecutor。
+        """
+        super().__init__(client, registry=registry)
+        self.max_concurrency = max_concurrency
+
+    async def execute_plan(self, plan: MissionPlan, step_delay: Optional[float] = None) -> bool:
+        """
+        并发执行完整的任务计划 (协程版本，需在事件循环中 await)
+
+        Returns:
+            bool: 所有执行链是否全部成功完成。
+        """
+        chains = self._group_by_drone(plan.mission_steps)
+        logger.info(f"🚀 Starting Mission: {len(plan.mission_steps)} steps in {len(chains)} parallel chains.")
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        results = await asyncio.gather(*(
+            self._run_chain(drone_id, steps, step_delay, semaphore)
+            for drone_id, steps in chains.items()
+        ))
+
+        if all(results):
+            logger.info("✅ Mission Completed Successfully.")
+            return True
+        logger.error("❌ Mission finished with failed chains.")
+        return False
+
+    @staticmethod
+    def _group_by_drone(steps: List[AgentAction]) -> Dict[Optional[str], List[AgentAction]]:
+        """按 drone_id 分组，组内保持原有顺序"""
+        chains: Dict[Optional[str], List[AgentAction]] = {}
+        for step in steps:
+            chains.setdefault(step.drone_id, []).append(step)
+        return chains
+
+    async def _run_chain(self, drone_id: Optional[str], steps: List[AgentAction],
+                         step_delay: Optional[float], semaphore: asyncio.Semaphore) -> bool:
+        """串行执行单架无人机的步骤，遇到失败即中止该链"""
+        label = drone_id or "global"
+        for i, step in enumerate(steps, 1):
+            logger.info(f"--- [{label}] Executing Step {i}/{len(steps)} ---")
+
+            # UAVAPIClient 是同步实现，放到工作线程中执行，不阻塞事件循环
+            async with semaphore:
+                success = await asyncio.to_thread(self._execute_single_step, step)
+
+            if not success:
+                logger.error(f"❌ [{label}] Chain aborted at step {i} due to failure.")
+                return False
+
+            # 等待只作用于同一条链内部，不限制不同无人机之间的并行
+            if i < len(steps):
+                if step_delay is not None:
+                    await asyncio.sleep(step_delay)
+                else:
+                    await asyncio.to_thread(self._wait_between_steps, step)
+
+        return True
@@ -2,6 +2,7 @@
 from typing import Optional
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
+from pydantic import TypeAdapter, ValidationError
 from src2.schemas import MissionPlan
 from src2.configuration import SystemConfig
 from src2.infrastructure import LLMInfrastructure
@@ -39,9 +40,22 @@ class NLPCommander:
             temperature=target_temp
         )
         
-        # ...加载 Prompt 和 Parser (保持不变)...
+        # 6. 加载 Prompt 和 Parser，并预先组装成 chain，每次调用直接复用
         self.system_prompt = self.config.get_agent_prompt(role)
         self.parser = PydanticOutputParser(pydantic_object=MissionPlan)
+        # Schema 说明文本只生成一次，作为常量注入 Prompt
+        self._format_instructions = self.parser.get_format_instructions()
+        # system_prompt 与 format_instructions 通过 partial 注入，避免其中的花括号被当作模板变量
+        self.prompt = ChatPromptTemplate.from_messages([
+            ("system", "{system_prompt}\n\n{format_instructions}"),
+            ("user", "{input}"),
+        ]).partial(
+            system_prompt=self.system_prompt,
+            format_instructions=self._format_instructions,
+        )
+        self.chain = self.prompt | self.llm
+        # 预编译的校验器：直接对原始 JSON 文本做校验 (pydantic-core 实现)
+        self._adapter = TypeAdapter(MissionPlan)
 
     def generate_plan(self, user_command: str) -> MissionPlan:
         """
@@ -49,10 +63,17 @@ class NLPCommander:
         """
         print(f"🧠 Planner receiving: '{user_command}'")
         try:
-            # invoke 会直接返回一个 MissionPlan 实例
-            plan = self.chain.invoke({"input": user_command})
-            return plan
+            response = self.chain.invoke({"input": user_command})
+            raw_content = getattr(response, "content", None)
+            if raw_content is None:
+                raw_content = str(response)
+            try:
+                # 快速路径：输出本身就是合法 JSON
+                return self._adapter.validate_json(raw_content)
+            except ValidationError:
+                # 兜底：带 Markdown 代码块等包裹时交给 PydanticOutputParser 提取
+                return self.parser.parse(raw_content)
         except Exception as e:
             print(f"❌ Planning failed: {e}")
-            # 返回空计划或抛出异常
-            return MissionPlan(mission_steps=[])
\ No newline at end of file
+            # 返回空计划或抛出异常 (内部构造的可信数据，跳过校验)
+            return MissionPlan.model_construct(mission_steps=[])
\ No newline at end of file
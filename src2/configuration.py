@@ -2,42 +2,83 @@
 import os
 import json
 import re
+import threading
 from pathlib import Path
-from typing import Dict, Any
+from types import MappingProxyType
+from typing import Dict, Any, Mapping
 from dotenv import load_dotenv
 
+# orjson 为可选依赖，未安装时回退到标准库 json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
 load_dotenv()
 
+# ${VAR} 环境变量占位符 (直接在 bytes 上匹配，省去 decode/encode)
+_ENV_RE = re.compile(rb'\$\{([^}]+?)\}')
+
+
+# 项目根目录 (配置路径均相对于此)
+_ROOT_PATH = Path(__file__).resolve().parent.parent
+
+
+def _replace_env(match: "re.Match") -> bytes:
+    return os.getenv(match.group(1).decode(), "").encode()
+
+
 class SystemConfig:
-    """全局配置中心：管理 LLM 连接、Agent 角色设定和 Prompt"""
+    """
+    全局配置中心：管理 LLM 连接、Agent 角色设定和 Prompt
+
+    同一配置文件只加载一次：多次 SystemConfig() (如创建多个 NLPCommander) 返回同一个实例。
+    """
+
+    _instances: Dict[Path, "SystemConfig"] = {}
+    _instances_lock = threading.Lock()
+
+    def __new__(cls, config_path: str = "config/llm_config.json"):
+        key = _ROOT_PATH / config_path
+        with cls._instances_lock:
+            instance = cls._instances.get(key)
+            if instance is None:
+                instance = super().__new__(cls)
+                instance._initialized = False
+                cls._instances[key] = instance
+        return instance
 
     def __init__(self, config_path: str = "config/llm_config.json"):
-        self.root_path = Path(__file__).resolve().parent.parent
+        if self._initialized:
+            return
+        self.root_path = _ROOT_PATH
         self.config_path = self.root_path / config_path
         self._raw_config = self._load_json()
+        # 角色配置的只读视图缓存 (实例按配置文件单例，缓存随实例存在)
+        self._agent_settings: Dict[str, Mapping[str, Any]] = {}
+        self._initialized = True
 
     def _load_json(self) -> Dict[str, Any]:
         """加载 JSON 并注入环境变量"""
         if not self.config_path.exists():
             raise FileNotFoundError(f"Config not found: {self.config_path}")
         
-        with open(self.config_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # 使用正则替换 ${VAR} 为环境变量
-        def replace_env(match):
-            var_name = match.group(1)
-            return os.getenv(var_name, "")
-        
-        content = re.sub(r'\$\{(.+?)\}', replace_env, content)
+        content = self.config_path.read_bytes()
+
+        # 替换 ${VAR} 为环境变量
+        content = _ENV_RE.sub(_replace_env, content)
+        if ORJSON_AVAILABLE:
+            return orjson.loads(content)
         return json.loads(content)
 
-    def get_llm_config(self, provider: str) -> Dict[str, Any]:
-        """获取特定 LLM 提供商的连接参数"""
+    def get_llm_config(self, provider: str) -> Mapping[str, Any]:
+        """获取特定 LLM 提供商的连接参数 (只读视图，调用方无需 copy；需要修改时请自行构造新 dict)"""
         providers = self._raw_config.get("providers", {})
         if provider not in providers:
             raise ValueError(f"Provider {provider} not found.")
-        return providers[provider]
+        return MappingProxyType(providers[provider])
 
     # --- 关键：Prompt 与角色管理 ---
     def get_agent_prompt(self, role: str) -> str:
@@ -57,6 +98,10 @@ class SystemConfig:
             
         return "You are a helpful AI assistant."
 
-    def get_agent_settings(self, role: str) -> Dict[str, Any]:
-        """获取特定 Agent 的额外配置 (如温度、最大重试次数等)"""
-        return self._raw_config.get("agents", {}).get(role, {})
\ No newline at end of file
+    def get_agent_settings(self, role: str) -> Mapping[str, Any]:
+        """获取特定 Agent 的额外配置 (如温度、最大重试次数等；只读视图，与 get_llm_config 一致)"""
+        settings = self._agent_settings.get(role)
+        if settings is None:
+            settings = MappingProxyType(self._raw_config.get("agents", {}).get(role, {}))
+            self._agent_settings[role] = settings
+        return settings
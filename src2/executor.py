@@ -7,13 +7,19 @@ from typing import Dict, Any, Optional
 from langchain_core.tools import BaseTool
 
 from src.uav_api_client import UAVAPIClient
-from src2.tools_registry import UAVToolRegistry
+from src2.tools_registry import ToolError, UAVToolRegistry
 from src2.schemas import MissionPlan, AgentAction
 
 # 配置基础日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("UAVExecutor")
 
+# 只读工具前缀：纯查询之间不需要任何等待
+_READ_PREFIXES = ("get_", "list_", "check_")
+
+# 表示上一条指令已执行完毕的无人机状态；其他状态 (含缺失/未知状态) 均视为仍在执行，直到 completion_timeout
+_DONE_STATES = frozenset({"idle"})
+
 class MissionExecutor:
     """
     任务执行器 (Action Executor)
@@ -24,32 +30,44 @@ class MissionExecutor:
     3. 负责任务执行的生命周期管理 (顺序执行、错误中断、延时控制)。
     """
 
-    def __init__(self, client: UAVAPIClient):
+    def __init__(self, client: UAVAPIClient, strict: bool = False,
+                 min_inter_step_ms: int = 50, completion_timeout: float = 30.0,
+                 registry: Optional[UAVToolRegistry] = None):
         """
         初始化执行器
         
         Args:
             client: 初始化的 UAVAPIClient 实例，用于连接物理/仿真无人机。
+            strict: 为 True 时所有步骤都走 LangChain tool.run (完整 args_schema 校验)，用于开发调试。
+            min_inter_step_ms: 控制类指令完成后、下一步开始前的最小间隔 (毫秒)。
+            completion_timeout: 等待单条控制指令完成的最长时间 (秒)，超时后继续执行下一步。
+            registry: (可选) 复用已有的工具注册表 (共享处理函数与只读结果缓存)，默认按 client 新建。
         """
         self.client = client
-        self.registry = UAVToolRegistry(client)
+        self.strict = strict
+        self.min_inter_step_ms = min_inter_step_ms
+        self.completion_timeout = completion_timeout
+        self.registry = registry if registry is not None else UAVToolRegistry(client)
         
-        # 策略：默认加载所有可用工具。
+        # 策略：默认加载所有可用工具 (包括懒加载注册表中尚未提供给 LLM 的工具)。
         # Executor 应当具备执行系统所有合法指令的能力。
         # 对能力的限制(如禁飞区)应在 Planning 阶段通过 Prompt 或 Tool 过滤处理。
         self.tools_map: Dict[str, BaseTool] = {
-            t.name: t for t in self.registry.get_all_tools()
+            t.name: t
+            for t in (self.registry.get_navigation_tools()
+                      + self.registry.get_perception_tools()
+                      + self.registry.get_system_tools())
         }
-        
+
         logger.info(f"Executor initialized with {len(self.tools_map)} tools.")
 
-    def execute_plan(self, plan: MissionPlan, step_delay: float = 1.0) -> bool:
+    def execute_plan(self, plan: MissionPlan, step_delay: Optional[float] = None) -> bool:
         """
         执行完整的任务计划
         
         Args:
             plan: 由 LLM 生成并校验过的 MissionPlan 对象。
-            step_delay: 步骤之间的安全延时 (秒)。
+            step_delay: 步骤之间的固定延时 (秒)。默认 None 表示按指令完成情况等待 (见 _wait_between_steps)。
             
         Returns:
             bool: 任务是否全部成功完成。
@@ -66,9 +84,9 @@ class MissionExecutor:
                 logger.error(f"❌ Mission Aborted at step {i} due to failure.")
                 return False
             
-            # 步骤间暂停，防止指令发送过快导致硬件阻塞
+            # 步骤间等待上一条指令完成，防止指令发送过快导致硬件阻塞
             if i < total_steps:
-                time.sleep(step_delay)
+                self._wait_between_steps(step, step_delay)
                 
         logger.info("✅ Mission Completed Successfully.")
         return True
@@ -78,7 +96,7 @@ class MissionExecutor:
         执行单个动作单元
         """
         tool_name = action.func
-        tool_params = action.params
+        tool_params = dict(action.params)
         thought = action.thought
 
         # 1. 打印思考过程 (如果有)
@@ -94,7 +112,21 @@ class MissionExecutor:
             return False
 
         # 3. 执行工具
-        # LangChain 的 Tool.run() 方法会自动处理:
+        # 快速路径：参数在解析 MissionPlan 时已按 func 校验为对应的强类型模型 (含范围约束)，
+        # 直接交给注册表的处理函数，不经过 LangChain tool.run；缓存失效与错误处理与工具调用共用同一处实现
+        if not self.strict:
+            try:
+                ok, result = self.registry.execute_step(action)
+            except Exception as e:
+                logger.critical("Unhandled Exception during execution: %s", e)
+                return False
+            if not ok:
+                logger.error("Execution Error: %s", result)
+                return False
+            logger.info("✅ Result: %s", result)
+            return True
+
+        # 严格模式：LangChain 的 Tool.run() 方法会自动处理:
         # - 参数校验 (基于 args_schema)
         # - 异常捕获 (如果在 Tool 定义中配置了 handle_tool_error，或者我们复用 registry 的 _safe_exec)
         try:
@@ -102,10 +134,8 @@ class MissionExecutor:
             # 这里我们获取结果并记录
             result_str = tool.run(tool_params)
             
-            # 简单的结果检查逻辑
-            # 由于 _safe_exec 即使报错也会返回字符串，我们需要根据内容判断是否真的成功
-            # 这里的判断逻辑比较简单，实际生产中可能需要解析 JSON 里的 status 字段
-            if "Error executing tool" in result_str:
+            # 处理函数出错时也返回字符串 (ToolError)，按类型判断是否真的成功
+            if isinstance(result_str, ToolError):
                 logger.error(f"Execution Error: {result_str}")
                 return False
             
@@ -117,3 +147,47 @@ class MissionExecutor:
             logger.critical(f"Unhandled Exception during execution: {str(e)}")
             return False
 
+    def _wait_between_steps(self, action: AgentAction, step_delay: Optional[float] = None):
+        """
+        两个步骤之间的等待策略：
+        - 指定了 step_delay：固定延时 (旧行为)；
+        - 纯查询 (或不针对某架无人机) 的步骤：不等待；
+        - 控制类步骤：轮询该无人机状态直到指令完成，再保留 min_inter_step_ms 的最小间隔。
+        """
+        if step_delay is not None:
+            time.sleep(step_delay)
+            return
+
+        drone_id = action.drone_id
+        if drone_id is None or action.func.startswith(_READ_PREFIXES):
+            return
+
+        self._wait_for_completion(drone_id)
+        time.sleep(self.min_inter_step_ms / 1000)
+
+    def _wait_for_completion(self, drone_id: str):
+        """
+        以指数退避 (10ms 起，最长 0.5s) 轮询无人机状态，直到 state 回到 idle 或超时。
+        状态读取失败、缺少 state 字段或出现未知取值时都按仍在执行处理，继续等待。
+        """
+        deadline = time.monotonic() + self.completion_timeout
+        delay = 0.01
+        while True:
+            state = None
+            try:
+                status = self.client.get_drone_status(drone_id)
+            except Exception as e:
+                logger.warning("Status poll failed for %s: %s", drone_id, e)
+            else:
+                if isinstance(status, dict):
+                    state = status.get("state")
+                    if state in _DONE_STATES:
+                        return
+
+            if time.monotonic() + delay > deadline:
+                logger.warning("Drone %s still '%s' after %.1fs, continuing.",
+                               drone_id, state, self.completion_timeout)
+                return
+
+            time.sleep(delay)
+            delay = min(delay * 2, 0.5)
@@ -1,10 +1,56 @@
 # src2/infrastructure.py
+import logging
+from functools import lru_cache
 from typing import Optional
-from langchain_ollama import ChatOllama
-from langchain_openai import ChatOpenAI
 from langchain_core.language_models.chat_models import BaseChatModel
 from src2.configuration import SystemConfig
 
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=32)
+def _create_llm_cached(config: SystemConfig,
+                       provider_name: str,
+                       model_name: Optional[str],
+                       temperature: Optional[float]) -> BaseChatModel:
+    """
+    按 (配置, provider, model, temperature) 缓存 LLM 实例，相同参数直接复用已有客户端及其连接池。
+    SystemConfig 为单例，按对象身份参与哈希；配置热更新后需调用 _create_llm_cached.cache_clear()。
+    """
+    # 获取基础连接配置 (Base URL, API Key, Type)
+    # 返回的是共享配置的只读视图，只读取字段，不做 copy
+    llm_conf = config.get_llm_config(provider_name)
+    
+    # === 核心逻辑：参数优先级 ===
+    # 运行时参数 > 配置文件默认值
+    final_model = model_name if model_name else llm_conf.get("model")
+    final_temp = temperature if temperature is not None else llm_conf.get("temperature", 0.1)
+
+    llm_type = llm_conf.get("type", "").lower()
+    
+    logger.debug("🏭 Init LLM: [%s] Model=[%s] Temp=[%s]", provider_name, final_model, final_temp)
+
+    # Provider 依赖较重，只导入实际用到的那一个 (配合实例缓存，每个进程每种 Provider 只导入一次)
+    if llm_type == "ollama":
+        from langchain_ollama import ChatOllama
+        return ChatOllama(
+            base_url=llm_conf.get("base_url"),
+            model=final_model,  # 使用最终决定的模型名
+            temperature=final_temp
+        )
+    elif llm_type == "openai":
+        from langchain_openai import ChatOpenAI
+        return ChatOpenAI(
+            base_url=llm_conf.get("base_url"),
+            api_key=llm_conf.get("api_key"),
+            model=final_model,  # 使用最终决定的模型名
+            temperature=final_temp,
+            max_retries=2
+        )
+    else:
+        raise ValueError(f"Unknown LLM type: {llm_type}")
+
+
 class LLMInfrastructure:
     def __init__(self, config: SystemConfig):
         self.config = config
@@ -14,37 +60,9 @@ class LLMInfrastructure:
                    model_name: Optional[str] = None, 
                    temperature: Optional[float] = None) -> BaseChatModel:
         """
-        创建 LLM 实例
+        创建 LLM 实例 (相同参数返回同一个缓存实例)
         :param provider_name: 对应配置文件中的 key (如 "Ollama")
         :param model_name: 强制指定模型名称 (如 "qwen2.5:1.5b")，如果不传则使用配置文件的默认值
         :param temperature: 覆盖温度设置
         """
-        # 获取基础连接配置 (Base URL, API Key, Type)
-        # 注意：这里用 copy 防止修改缓存的配置
-        llm_conf = self.config.get_llm_config(provider_name).copy()
-        
-        # === 核心逻辑：参数优先级 ===
-        # 运行时参数 > 配置文件默认值
-        final_model = model_name if model_name else llm_conf.get("model")
-        final_temp = temperature if temperature is not None else llm_conf.get("temperature", 0.1)
-
-        llm_type = llm_conf.get("type", "").lower()
-        
-        print(f"🏭 Init LLM: [{provider_name}] Model=[{final_model}] Temp=[{final_temp}]")
-
-        if llm_type == "ollama":
-            return ChatOllama(
-                base_url=llm_conf.get("base_url"),
-                model=final_model,  # 使用最终决定的模型名
-                temperature=final_temp
-            )
-        elif llm_type == "openai":
-            return ChatOpenAI(
-                base_url=llm_conf.get("base_url"),
-                api_key=llm_conf.get("api_key"),
-                model=final_model,  # 使用最终决定的模型名
-                temperature=final_temp,
-                max_retries=2
-            )
-        else:
-            raise ValueError(f"Unknown LLM type: {llm_type}")
\ No newline at end of file
+        return _create_llm_cached(self.config, provider_name, model_name, temperature)
@@ -1,7 +1,19 @@
 # src2/schemas.py
 from enum import Enum
-from typing import List, Optional, Dict, Any, Union
-from pydantic import BaseModel, Field
+from typing import Annotated, List, Literal, Optional, Dict, Any, Union
+from pydantic import BaseModel, ConfigDict, Field
+
+# orjson 为可选依赖，未安装时回退到标准库 json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    import json
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+# 参数模型 JSON Schema 缓存: {模型类: 序列化后的 schema}
+_JSON_SCHEMA_CACHE: Dict[type, bytes] = {}
 
 # ==========================================
 # 1. 基础数据模型 (Basic Models)
@@ -18,7 +30,31 @@ class Vertex(BaseModel):
     x: float
     y: float
 
-class DroneBaseParams(BaseModel):
+class _ToolParamsBase(BaseModel):
+    """
+    工具参数模型公共基类 (参数对象构建后只读，子类继承该配置；JSON Schema 按类缓存)
+
+    这些模型同时用于解析 LLM 生成的 MissionPlan：LLM 多给的字段直接忽略，
+    不能因为某一步的一个多余参数就拒绝整个计划。
+    """
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
+    @classmethod
+    def model_json_schema(cls, *args, **kwargs) -> Dict[str, Any]:
+        """
+        参数模型的 schema 固定不变，默认参数的调用结果按类缓存 (LangChain 每次渲染工具说明都会调用)。
+        缓存序列化后的文本，每次反序列化出新 dict，调用方修改返回值不会影响缓存。
+        """
+        if args or kwargs:
+            return super().model_json_schema(*args, **kwargs)
+        cached = _JSON_SCHEMA_CACHE.get(cls)
+        if cached is None:
+            schema = super().model_json_schema()
+            cached = orjson.dumps(schema) if ORJSON_AVAILABLE else json.dumps(schema).encode("utf-8")
+            _JSON_SCHEMA_CACHE[cls] = cached
+        return orjson.loads(cached) if ORJSON_AVAILABLE else json.loads(cached)
+
+class DroneBaseParams(_ToolParamsBase):
     """所有针对特定无人机操作的基类"""
     drone_id: str = Field(
         ..., 
@@ -52,20 +88,40 @@ class ObstacleType(str, Enum):
     ELLIPSE = "ellipse"   # 椭圆柱障碍物 (灰蓝色) - 使用 width, length, height
     POLYGON = "polygon"   # 多面体障碍物 (灰色) - 使用 vertices, height
 
-class Obstacle(BaseModel):
-    """障碍物定义 (兼容 Point, Cylinder, Ellipse, Polygon)"""
+class _ObstacleBase(BaseModel):
+    """障碍物公共字段"""
     # ??? 关于不同的障碍物有什么字段，并没有详细检验，先这样写
     id: str
     name: str
-    type: str = Field(..., description="障碍物类型") # 建议对应 ObstacleType
     position: Position
     height: Optional[float] = Field(None, description="障碍物高度")
-    
-    # --- 不同形状的特有字段 ---
-    radius: Optional[float] = Field(None, description="半径 (用于 Cylinder)")
-    width: Optional[float] = Field(None, description="宽度/长轴 (用于 Ellipse)")
-    length: Optional[float] = Field(None, description="长度/短轴 (用于 Ellipse)")
-    vertices: Optional[List[Vertex]] = Field(None, description="底面顶点列表 (用于 Polygon)")
+
+class PointObstacle(_ObstacleBase):
+    """点障碍物"""
+    type: Literal["point"] = Field(..., description="障碍物类型")
+
+class CylinderObstacle(_ObstacleBase):
+    """圆柱障碍物"""
+    type: Literal["cylinder"] = Field(..., description="障碍物类型")
+    radius: Optional[float] = Field(None, description="半径")
+
+class EllipseObstacle(_ObstacleBase):
+    """椭圆柱障碍物"""
+    type: Literal["ellipse"] = Field(..., description="障碍物类型")
+    width: Optional[float] = Field(None, description="宽度/长轴")
+    length: Optional[float] = Field(None, description="长度/短轴")
+
+class PolygonObstacle(_ObstacleBase):
+    """多面体障碍物"""
+    type: Literal["polygon"] = Field(..., description="障碍物类型")
+    vertices: Optional[List[Vertex]] = Field(None, description="底面顶点列表")
+
+# 障碍物定义 (按 type 字段区分的联合类型，取值见 ObstacleType)
+# 校验时根据 type 直接选中对应模型，只校验该形状适用的字段
+Obstacle = Annotated[
+    Union[PointObstacle, CylinderObstacle, EllipseObstacle, PolygonObstacle],
+    Field(discriminator="type"),
+]
 
 class Target(BaseModel):
     """目标点定义"""
@@ -151,22 +207,133 @@ class GetNearbyEntitiesParams(DroneBaseParams):
     """获取周边感知信息"""
     pass
 
+class DiscoverToolsParams(_ToolParamsBase):
+    """discover_tools 元工具的参数：按名称加载延迟注册的工具"""
+    load: List[str] = Field(..., description="Names of the extra tools to load, e.g. [\"charge\", \"take_photo\"].")
+
 # ==========================================
 # 4. LLM 输出结构 (LLM Output Contracts)
 # 融合两种模式：既支持指令流，也支持 ReAct 思考流
 # ==========================================
+# 信任边界：
+# - LLM 输出 (不可信) 必须完整校验，直接对原始 JSON 文本调用 model_validate_json / TypeAdapter.validate_json，
+#   不要先 json.loads 再 MissionPlan(**data)；
+# - 代码内部构造、字段已知合法的对象 (如空计划) 可用 model_construct 跳过校验。
+
+class NoParams(_ToolParamsBase):
+    """无参数工具 (list_drones 等) 的空参数"""
+
+class _ActionBase(BaseModel):
+    """单步动作公共部分：func 为工具名 (联合类型的判别字段)，params 为该工具的强类型参数"""
+    model_config = ConfigDict(extra="ignore", frozen=True)
 
-class AgentAction(BaseModel):
-    """单步动作定义"""
-    func: str = Field(..., description="The tool function name (e.g., 'take_off')")
-    params: Dict[str, Any] = Field(default_factory=dict, description="Parameters for the function")
     thought: Optional[str] = Field(None, description="Reasoning behind this action")
 
+    @property
+    def drone_id(self) -> Optional[str]:
+        """动作针对的无人机 ID (全局查询类动作为 None)"""
+        return getattr(self.params, "drone_id", None)
+
+class TakeOffAction(_ActionBase):
+    func: Literal["take_off"]
+    params: TakeOffParams
+
+class LandAction(_ActionBase):
+    func: Literal["land"]
+    params: LandParams
+
+class MoveToAction(_ActionBase):
+    func: Literal["move_to"]
+    params: MoveToParams
+
+class MoveTowardsAction(_ActionBase):
+    func: Literal["move_towards"]
+    params: MoveTowardsParams
+
+class ChangeAltitudeAction(_ActionBase):
+    func: Literal["change_altitude"]
+    params: ChangeAltitudeParams
+
+class RotateAction(_ActionBase):
+    func: Literal["rotate"]
+    params: RotateParams
+
+class HoverAction(_ActionBase):
+    func: Literal["hover"]
+    params: HoverParams
+
+class ReturnHomeAction(_ActionBase):
+    func: Literal["return_home"]
+    params: ReturnHomeParams
+
+class SetHomeAction(_ActionBase):
+    func: Literal["set_home"]
+    params: SetHomeParams
+
+class CalibrateAction(_ActionBase):
+    func: Literal["calibrate"]
+    params: CalibrateParams
+
+class ChargeAction(_ActionBase):
+    func: Literal["charge"]
+    params: ChargeParams
+
+class TakePhotoAction(_ActionBase):
+    func: Literal["take_photo"]
+    params: TakePhotoParams
+
+class GetDroneStatusAction(_ActionBase):
+    func: Literal["get_drone_status"]
+    params: DroneBaseParams
+
+class GetNearbyEntitiesAction(_ActionBase):
+    func: Literal["get_nearby_entities"]
+    params: GetNearbyEntitiesParams
+
+class ListDronesAction(_ActionBase):
+    func: Literal["list_drones"]
+    params: NoParams = Field(default_factory=NoParams)
+
+class GetWeatherAction(_ActionBase):
+    func: Literal["get_weather"]
+    params: NoParams = Field(default_factory=NoParams)
+
+class GetTaskProgressAction(_ActionBase):
+    func: Literal["get_task_progress"]
+    params: NoParams = Field(default_factory=NoParams)
+
+# 单步动作定义：按 func 判别的联合类型。
+# 解析 MissionPlan 时按 func 直接选中对应动作并一次性校验 params，执行时无需再按工具名二次校验。
+AgentAction = Annotated[
+    Union[
+        TakeOffAction,
+        LandAction,
+        MoveToAction,
+        MoveTowardsAction,
+        ChangeAltitudeAction,
+        RotateAction,
+        HoverAction,
+        ReturnHomeAction,
+        SetHomeAction,
+        CalibrateAction,
+        ChargeAction,
+        TakePhotoAction,
+        GetDroneStatusAction,
+        GetNearbyEntitiesAction,
+        ListDronesAction,
+        GetWeatherAction,
+        GetTaskProgressAction,
+    ],
+    Field(discriminator="func"),
+]
+
 class MissionPlan(BaseModel):
     """
     [模式 A: 规划器]
     适用于 NLP Commander，一次性生成多步计划
     """
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     mission_steps: List[AgentAction] = Field(..., description="Ordered list of steps to execute.")
 
 class AgentThought(BaseModel):
@@ -1,9 +1,18 @@
 # src2/tools_registry.py
 import json
-from typing import List, Callable, Optional
-from langchain_core.tools import StructuredTool, BaseTool, Tool
+import time
+from typing import Any, Dict, List, Callable, Optional, Tuple
+from langchain_core.tools import StructuredTool, BaseTool
 
-from uav_api_client import UAVAPIClient
+# orjson 为可选依赖，未安装时回退到标准库 json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+from src.uav_api_client import UAVAPIClient, UAVAPIError
 from src2.schemas import (
     # Navigation Params
     TakeOffParams,
@@ -21,105 +30,222 @@ from src2.schemas import (
     SetHomeParams,
     CalibrateParams,
     ChargeParams,
-    TakePhotoParams
+    TakePhotoParams,
+    DiscoverToolsParams,
+    NoParams,
+    # LLM Output
+    AgentAction,
+    MissionPlan,
 )
 
+def _json_default(obj: Any) -> Any:
+    """序列化兜底：Pydantic 模型转为 dict，其他对象转为字符串"""
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    return str(obj)
+
+
+def _dumps(result: Any, indent: bool = False) -> str:
+    """
+    将工具结果序列化为 JSON 字符串 (优先使用 orjson)。
+    结果的读者是 LLM，默认输出紧凑格式以减少 token；indent=True 仅用于人工调试。
+    """
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(result, default=_json_default, option=option).decode("utf-8")
+    if indent:
+        return json.dumps(result, indent=2, ensure_ascii=False, default=_json_default)
+    return json.dumps(result, ensure_ascii=False, separators=(",", ":"), default=_json_default)
+
+
+class ToolError(str):
+    """
+    工具调用失败时返回给 LLM 的错误描述。
+    对 LLM 和 LangChain 而言仍是普通字符串；调用方用 isinstance 判断失败，无需匹配错误文本。
+    """
+    __slots__ = ()
+
+
+def _tool_error(detail: Any) -> ToolError:
+    return ToolError(f"Error executing tool: {detail}")
+
+# 工具调用中预期会出现的异常：API 请求失败、LLM 给出的参数与方法签名不符、参数取值或响应内容非法
+_TOOL_ERRORS = (UAVAPIError, TypeError, ValueError)
+
+
+def _make_wrapper(client_method: Callable, cache: Dict[tuple, Tuple[float, str]],
+                  read_ttl: Optional[float] = None, indent: bool = False,
+                  dumps: Callable[..., str] = _dumps, monotonic: Callable[[], float] = time.monotonic,
+                  err: Callable[[Exception], str] = _tool_error) -> Callable[..., str]:
+    """
+    为 client 方法生成工具函数，返回 JSON 字符串 (_TOOL_ERRORS 中的异常转为 ToolError 返回，其他异常视为程序错误继续抛出)。
+    闭包直接持有绑定方法、缓存与序列化函数，调用时没有 self 属性查找与额外的转发调用。
+
+    :param cache: 注册表共享的只读结果缓存 {(方法名, 排序后的参数): (写入时间, JSON 字符串)}
+    :param read_ttl: None 表示控制类指令 (执行前清空 cache，因为无人机状态将改变)；
+                     否则为只读查询，read_ttl 秒内相同参数直接返回缓存结果 (失败结果不缓存)
+    """
+    name = client_method.__name__
+
+    if read_ttl is None:
+        def _w(**kw) -> str:
+            if cache:
+                cache.clear()
+            try:
+                return dumps(client_method(**kw), indent)
+            except _TOOL_ERRORS as e:
+                return err(e)
+    else:
+        def _w(**kw) -> str:
+            key = (name, tuple(sorted(kw.items())))
+            now = monotonic()
+            hit = cache.get(key)
+            if hit is not None and now - hit[0] < read_ttl:
+                return hit[1]
+            try:
+                result = dumps(client_method(**kw), indent)
+            except _TOOL_ERRORS as e:
+                return err(e)
+            cache[key] = (now, result)
+            return result
+
+    _w.__name__ = name
+    return _w
+
+
+# 注册表提供的全部工具名 (与 UAVAPIClient 方法同名)，同时也是工具列表的固定顺序：
+# 工具 schema 位于 Prompt 前缀中，顺序变化会使 Provider 的 Prompt 缓存失效，因此不依赖各分组的拼接顺序
+_CANONICAL_ORDER = (
+    "take_off", "land", "move_to", "move_towards", "change_altitude", "rotate", "hover", "return_home",
+    "get_drone_status", "get_nearby_entities", "list_drones", "get_weather",
+    "set_home", "calibrate", "charge", "take_photo", "get_task_progress",
+)
+_CANONICAL_INDEX = {name: i for i, name in enumerate(_CANONICAL_ORDER)}
+
+# 只读工具：结果按 resp_ttl 缓存
+_READ_TOOLS = frozenset({"get_drone_status", "get_nearby_entities", "list_drones", "get_weather", "get_task_progress"})
+
+
+# 懒加载模式下默认提供给 LLM 的核心工具，其余工具通过 discover_tools 按需加载
+CORE_TOOLS = frozenset({
+    "take_off", "land", "move_to", "hover", "return_home",
+    "get_drone_status", "get_nearby_entities", "list_drones",
+})
+
+
 class UAVToolRegistry:
     """
-    UAV 工具注册表 - 显式参数版
+    UAV 工具注册表
     优点：
     1. 完美适配 LangChain 的参数解包调用机制。
-    2. IDE 可以提供完整的代码补全和类型提示。
+    2. 工具函数由 _make_wrapper 按 client 方法统一生成，参数由 args_schema 定义并校验。
     3. AI 通过 args_schema 获取元数据，不受函数签名影响。
     """
 
-    def __init__(self, client: UAVAPIClient):
+    __slots__ = (
+        "client", "debug", "lazy", "resp_ttl", "_resp_cache",
+        "_nav_tools", "_perc_tools", "_sys_tools", "_all_tools", "_deferred", "_active_tools",
+        "_tool_by_name", "_bound_llm", "_bound_source", "_handlers",
+    )
+
+    def __init__(self, client: UAVAPIClient, debug: bool = False, lazy: bool = False, resp_ttl: float = 0.5):
+        """
+        :param client: UAVAPIClient 实例
+        :param debug: 为 True 时工具结果以缩进格式输出，便于人工查看
+        :param lazy: 为 True 时 get_all_tools 只返回 CORE_TOOLS 与 discover_tools，减少 Prompt 中的工具 schema
+        :param resp_ttl: 只读感知工具结果的缓存有效期 (秒)，0 表示不缓存
+        """
         self.client = client
+        self.debug = debug
+        self.lazy = lazy
+        self.resp_ttl = resp_ttl
+        # 只读工具结果缓存: {(方法名, 排序后的参数): (写入时间 monotonic, JSON 字符串)}
+        self._resp_cache: Dict[tuple, Tuple[float, str]] = {}
+        # 工具名 -> 处理函数：LangChain 工具与批量执行 MissionPlan (绕过 LangChain 的工具查找与回调) 共用
+        self._handlers: Dict[str, Callable[..., str]] = {
+            name: _make_wrapper(getattr(client, name), self._resp_cache,
+                                read_ttl=resp_ttl if name in _READ_TOOLS else None, indent=debug)
+            for name in _CANONICAL_ORDER
+        }
+        # 工具列表在构造时一次性构建：StructuredTool.from_function 会对 args_schema 做 Pydantic 内省，开销较大
+        self._nav_tools: List[BaseTool] = self._build_navigation_tools()
+        self._perc_tools: List[BaseTool] = self._build_perception_tools()
+        self._sys_tools: List[BaseTool] = self._build_system_tools()
+        self._all_tools: List[BaseTool] = sorted(self._nav_tools + self._perc_tools + self._sys_tools,
+                                                 key=lambda t: _CANONICAL_INDEX[t.name])
+        # 当前提供给 LLM 的工具：非懒加载模式下即全部工具
+        if lazy:
+            self._deferred: Dict[str, BaseTool] = {t.name: t for t in self._all_tools if t.name not in CORE_TOOLS}
+            # 核心工具按固定顺序排列，discover_tools 在其后；按需加载的工具依次追加到末尾，保持已有前缀不变
+            self._active_tools: List[BaseTool] = [t for t in self._all_tools if t.name in CORE_TOOLS]
+            self._active_tools.append(self._build_discover_tool())
+        else:
+            self._deferred = {}
+            self._active_tools = self._all_tools
+        # 工具名 -> 工具对象 (含懒加载模式下尚未加载的工具)，O(1) 查找
+        self._tool_by_name: Dict[str, BaseTool] = {t.name: t for t in self._all_tools}
+        # prewarm() 绑定过工具的 LLM 及其原始实例
+        self._bound_llm = None
+        self._bound_source = None
 
-    def _safe_exec(self, func: Callable, **kwargs) -> str:
-        """Helper to execute client methods safely and return JSON string."""
-        try:
-            result = func(**kwargs)
-            return json.dumps(result, indent=2, ensure_ascii=False)
-        except Exception as e:
-            return f"Error executing tool: {str(e)}"
+    def close(self):
+        """会话结束时关闭底层 HTTP 连接池 (client 的 keep-alive Session 由所有实例共享，之后的请求会重新建立)"""
+        self._resp_cache.clear()
+        self.client.close_session()
 
     # ==========================================
     # 1. Navigation Tools (Control Logic)
     # ==========================================
 
     def get_navigation_tools(self) -> List[BaseTool]:
-        
-        # 显式定义参数，IDE 友好
-        def take_off(drone_id: str, altitude: float = 10.0) -> str:
-            return self._safe_exec(self.client.take_off, drone_id=drone_id, altitude=altitude)
-
-        def land(drone_id: str) -> str:
-            return self._safe_exec(self.client.land, drone_id=drone_id)
-
-        def move_to(drone_id: str, x: float, y: float, z: float) -> str:
-            return self._safe_exec(self.client.move_to, drone_id=drone_id, x=x, y=y, z=z)
-
-        def move_towards(drone_id: str, distance: float, heading: Optional[float] = None, dz: Optional[float] = None) -> str:
-            return self._safe_exec(self.client.move_towards, drone_id=drone_id, distance=distance, heading=heading, dz=dz)
-
-        def change_altitude(drone_id: str, altitude: float) -> str:
-            return self._safe_exec(self.client.change_altitude, drone_id=drone_id, altitude=altitude)
-
-        def rotate(drone_id: str, heading: float) -> str:
-            return self._safe_exec(self.client.rotate, drone_id=drone_id, heading=heading)
-
-        def hover(drone_id: str, duration: Optional[float] = None) -> str:
-            return self._safe_exec(self.client.hover, drone_id=drone_id, duration=duration)
-
-        def return_home(drone_id: str) -> str:
-            return self._safe_exec(self.client.return_home, drone_id=drone_id)
+        return list(self._nav_tools)
 
+    def _build_navigation_tools(self) -> List[BaseTool]:
         return [
             StructuredTool.from_function(
-                func=take_off,
+                func=self._handlers["take_off"],
                 name="take_off",
                 description="Command a drone to take off to a specific altitude.",
                 args_schema=TakeOffParams
             ),
             StructuredTool.from_function(
-                func=land,
+                func=self._handlers["land"],
                 name="land",
                 description="Command a drone to land at its current position.",
                 args_schema=LandParams
             ),
             StructuredTool.from_function(
-                func=move_to,
+                func=self._handlers["move_to"],
                 name="move_to",
                 description="Move a drone to specific absolute coordinates (x, y, z).",
                 args_schema=MoveToParams
             ),
             StructuredTool.from_function(
-                func=move_towards,
+                func=self._handlers["move_towards"],
                 name="move_towards",
                 description="Move a drone a specific distance relative to its position.",
                 args_schema=MoveTowardsParams
             ),
             StructuredTool.from_function(
-                func=change_altitude,
+                func=self._handlers["change_altitude"],
                 name="change_altitude",
                 description="Change a drone's absolute altitude.",
                 args_schema=ChangeAltitudeParams
             ),
             StructuredTool.from_function(
-                func=rotate,
+                func=self._handlers["rotate"],
                 name="rotate",
                 description="Rotate a drone to a specific heading (0-360).",
                 args_schema=RotateParams
             ),
             StructuredTool.from_function(
-                func=hover,
+                func=self._handlers["hover"],
                 name="hover",
                 description="Command a drone to hover in place.",
                 args_schema=HoverParams
             ),
             StructuredTool.from_function(
-                func=return_home,
+                func=self._handlers["return_home"],
                 name="return_home",
                 description="Command a drone to return to its home position.",
                 args_schema=ReturnHomeParams
@@ -131,43 +257,34 @@ class UAVToolRegistry:
     # ==========================================
 
     def get_perception_tools(self) -> List[BaseTool]:
+        return list(self._perc_tools)
 
-        def get_drone_status(drone_id: str) -> str:
-            return self._safe_exec(self.client.get_drone_status, drone_id=drone_id)
-
-        def get_nearby_entities(drone_id: str) -> str:
-            return self._safe_exec(self.client.get_nearby_entities, drone_id=drone_id)
-
-        def list_drones() -> str:
-            return self._safe_exec(self.client.list_drones)
-
-        def get_weather() -> str:
-            return self._safe_exec(self.client.get_weather)
-
+    def _build_perception_tools(self) -> List[BaseTool]:
         return [
             StructuredTool.from_function(
-                func=get_drone_status,
+                func=self._handlers["get_drone_status"],
                 name="get_drone_status",
                 description="Get detailed status (position, battery, state) of a specific drone.",
                 args_schema=DroneBaseParams
             ),
             StructuredTool.from_function(
-                func=get_nearby_entities,
+                func=self._handlers["get_nearby_entities"],
                 name="get_nearby_entities",
                 description="Get entities (drones, targets, obstacles) within the drone's perception radius.",
                 args_schema=GetNearbyEntitiesParams
             ),
-            Tool(
+            # 无参数工具显式使用空的 NoParams schema，LangChain 按 {} 调用，不再需要忽略 tool_input 的包装
+            StructuredTool.from_function(
+                func=self._handlers["list_drones"],
                 name="list_drones",
-                # 注意：对于没有参数的 Tool，LangChain 有时会传一个空字符串作为 tool_input
-                # 我们用 lambda 忽略它
-                func=lambda tool_input: list_drones(),
-                description="List all available drones in the session. No input required."
+                description="List all available drones in the session. No input required.",
+                args_schema=NoParams
             ),
-            Tool(
+            StructuredTool.from_function(
+                func=self._handlers["get_weather"],
                 name="get_weather",
-                func=lambda tool_input: get_weather(),
-                description="Get current weather conditions. No input required."
+                description="Get current weather conditions. No input required.",
+                args_schema=NoParams
             ),
         ]
 
@@ -176,51 +293,39 @@ class UAVToolRegistry:
     # ==========================================
 
     def get_system_tools(self) -> List[BaseTool]:
+        return list(self._sys_tools)
 
-        def set_home(drone_id: str) -> str:
-            return self._safe_exec(self.client.set_home, drone_id=drone_id)
-
-        def calibrate(drone_id: str) -> str:
-            return self._safe_exec(self.client.calibrate, drone_id=drone_id)
-
-        def charge(drone_id: str, charge_amount: float) -> str:
-            return self._safe_exec(self.client.charge, drone_id=drone_id, charge_amount=charge_amount)
-        
-        def take_photo(drone_id: str) -> str:
-            return self._safe_exec(self.client.take_photo, drone_id=drone_id)
-        
-        def get_task_progress() -> str:
-            return self._safe_exec(self.client.get_task_progress)
-
+    def _build_system_tools(self) -> List[BaseTool]:
         return [
             StructuredTool.from_function(
-                func=set_home,
+                func=self._handlers["set_home"],
                 name="set_home",
                 description="Set the drone's current position as its new home.",
                 args_schema=SetHomeParams
             ),
             StructuredTool.from_function(
-                func=calibrate,
+                func=self._handlers["calibrate"],
                 name="calibrate",
                 description="Calibrate the drone's sensors.",
                 args_schema=CalibrateParams
             ),
             StructuredTool.from_function(
-                func=charge,
+                func=self._handlers["charge"],
                 name="charge",
                 description="Charge the drone's battery (must be at station).",
                 args_schema=ChargeParams
             ),
             StructuredTool.from_function(
-                func=take_photo,
+                func=self._handlers["take_photo"],
                 name="take_photo",
                 description="Take a photo with the drone's camera.",
                 args_schema=TakePhotoParams
             ),
-            Tool(
+            StructuredTool.from_function(
+                func=self._handlers["get_task_progress"],
                 name="get_task_progress",
-                func=lambda tool_input: get_task_progress(),
-                description="Check the current mission task progress. No input required."
+                description="Check the current mission task progress. No input required.",
+                args_schema=NoParams
             )
         ]
 
@@ -229,8 +334,83 @@ class UAVToolRegistry:
     # ==========================================
 
     def get_all_tools(self) -> List[BaseTool]:
-        return (
-            self.get_navigation_tools() + 
-            self.get_perception_tools() + 
-            self.get_system_tools()
-        )
\ No newline at end of file
+        """当前提供给 LLM 的工具 (懒加载模式下为核心工具 + discover_tools + 已按需加载的工具)"""
+        return list(self._active_tools)
+
+    def get_tool(self, name: str) -> BaseTool:
+        """按名称获取工具，不存在时抛出 KeyError"""
+        return self._tool_by_name[name]
+
+    def _build_discover_tool(self) -> BaseTool:
+        return StructuredTool.from_function(
+            func=self._h_discover_tools,
+            name="discover_tools",
+            description=(
+                "Load extra tools that are not available yet. "
+                f"Available to load: {', '.join(sorted(self._deferred))}."
+            ),
+            args_schema=DiscoverToolsParams
+        )
+
+    def _h_discover_tools(self, load: List[str]) -> str:
+        """
+        将 load 中列出的延迟工具加入当前工具列表。
+        加载后工具集发生变化，调用方需重新 get_all_tools() / prewarm() 以绑定新工具。
+        """
+        loaded, unknown = [], []
+        for name in load:
+            tool = self._deferred.pop(name, None)
+            if tool is None:
+                # 已加载过的核心工具不算未知
+                if name not in self._tool_by_name:
+                    unknown.append(name)
+                continue
+            self._active_tools.append(tool)
+            loaded.append(name)
+        if loaded:
+            self._bound_source = None
+        return _dumps({"loaded": loaded, "unknown": unknown, "remaining": sorted(self._deferred)}, indent=self.debug)
+
+    @property
+    def tools_fingerprint(self) -> tuple:
+        """当前工具集的指纹 (工具名排序后的元组)，工具集不变时保持稳定，可作为缓存 key"""
+        return tuple(sorted(t.name for t in self._active_tools))
+
+    def prewarm(self, llm):
+        """
+        在会话启动时预先执行 llm.bind_tools，把工具 schema 的转换开销移出第一轮对话的关键路径。
+        同一个 llm 重复调用直接返回已绑定的实例 (discover_tools 加载新工具后会重新绑定)。
+        """
+        if self._bound_source is not llm:
+            self._bound_llm = llm.bind_tools(self._active_tools)
+            self._bound_source = llm
+        return self._bound_llm
+
+    # ==========================================
+    # 5. Batch Execution
+    # ==========================================
+
+    def execute_step(self, step: AgentAction) -> Tuple[bool, str]:
+        """
+        直接执行单个计划步骤 (不经过 LangChain 的工具查找与 args_schema 校验：
+        step.params 在解析 MissionPlan 时已按 func 校验为对应的强类型模型)。
+        与工具共用同一处理函数，控制类指令同样会清空只读结果缓存。
+        :return: (是否成功, 与对应工具相同的 JSON 字符串或错误描述)
+        """
+        handler = self._handlers.get(step.func)
+        if handler is None:
+            return False, _tool_error(f"unknown tool '{step.func}'")
+        result = handler(**dict(step.params))
+        return not isinstance(result, ToolError), result
+
+    async def execute_plan(self, plan: MissionPlan, step_delay: Optional[float] = None) -> bool:
+        """
+        并发执行 MissionPlan (协程版本，需在事件循环中 await)。
+
+        委托给 AsyncMissionExecutor：按 drone_id 分链并行，链内串行并等待上一条控制指令完成，
+        某步失败即中止该链；步骤经本注册表的处理函数执行，与工具调用共用结果缓存。
+        :return: 所有执行链是否全部成功完成
+        """
+        # executor 模块依赖本模块，在调用时导入以避免循环导入
+        from src2.async_executor import AsyncMissionExecutor
+        return await AsyncMissionExecutor(self.client, registry=self).execute_plan(plan, step_delay)
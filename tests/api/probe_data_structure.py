@@ -4,12 +4,23 @@ import time
 from pathlib import Path
 
 # 环境配置
-current_dir = Path(__file__).resolve().parent
-project_root = current_dir.parent.parent
-sys.path.append(str(project_root))
+# pytest 运行时由 pytest.ini 的 pythonpath 设置；直接以脚本运行时在这里补上 (只插入一次)
+project_root = str(Path(__file__).resolve().parents[2])
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
 from src.uav_api_client import UAVAPIClient
 
+# Payload 是给人看的 (作为 Schema 依据)，保留缩进；orjson 在 C 层完成缩进输出，未安装时回退到标准库
+try:
+    import orjson
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8")
+except ImportError:
+    def _dumps(obj) -> str:
+        return json.dumps(obj, indent=2)
+
 def probe_structure():
     print("🔬 Probing Data Structures & Missing Commands...")
     client = UAVAPIClient("http://localhost:8000")
@@ -70,7 +81,7 @@ def probe_structure():
     try:
         status_data = client.get_drone_status(drone_id)
         print("\n📄 [Payload] get_drone_status:")
-        print(json.dumps(status_data, indent=2))
+        print(_dumps(status_data))
     except Exception as e:
         print(f"❌ Failed to get status: {e}")
 
@@ -78,7 +89,7 @@ def probe_structure():
     try:
         nearby_data = client.get_nearby_entities(drone_id)
         print("\n📄 [Payload] get_nearby_entities:")
-        print(json.dumps(nearby_data, indent=2))
+        print(_dumps(nearby_data))
     except Exception as e:
         print(f"❌ Failed to get nearby: {e}")
 
@@ -4,9 +4,10 @@ import json
 from pathlib import Path
 
 # 环境设置
-current_dir = Path(__file__).resolve().parent
-project_root = current_dir.parent
-sys.path.append(str(project_root))
+# pytest 运行时由 pytest.ini 的 pythonpath 设置；直接以脚本运行时在这里补上 (只插入一次)
+project_root = str(Path(__file__).resolve().parents[2])
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
 from src.uav_api_client import UAVAPIClient
 from src2.tools_registry import UAVToolRegistry
@@ -17,8 +18,7 @@ def prove_it():
     registry = UAVToolRegistry(client)
     
     # 2. 获取 take_off 工具
-    nav_tools = registry.get_navigation_tools()
-    take_off_tool = next(t for t in nav_tools if t.name == "take_off")
+    take_off_tool = registry.get_tool("take_off")
 
     print(f"🛠️  当前检查工具: [{take_off_tool.name}]")
     print(f"🐍 内部函数签名: {take_off_tool.func}") 
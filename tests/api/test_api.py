@@ -1,8 +1,16 @@
 # tests\api\test_api.py
-import time
+import asyncio
 import json
+from itertools import groupby
 from uav_api_client import UAVAPIClient
 
+# 函数名 -> UAVAPIClient 的公开方法 (模块加载时构建一次，执行时单次字典查找)
+METHOD_TABLE = {
+    name: getattr(UAVAPIClient, name)
+    for name in dir(UAVAPIClient)
+    if not name.startswith("_") and callable(getattr(UAVAPIClient, name))
+}
+
 # --- 核心封装：通用指令执行器 ---
 def execute_command(client: UAVAPIClient, func_name: str, params: dict = None):
     """
@@ -16,22 +24,44 @@ def execute_command(client: UAVAPIClient, func_name: str, params: dict = None):
     if params is None:
         params = {}
 
-    # 1. 检查 Client 里有没有这个函数
-    if not hasattr(client, func_name):
+    # 1. 查表获取函数对象 (未绑定方法)
+    func = METHOD_TABLE.get(func_name)
+    if func is None:
         return f"❌ Error: Function '{func_name}' not found."
 
-    # 2. 获取函数对象
-    func = getattr(client, func_name)
-
-    # 3. 执行函数
+    # 2. 执行函数
     try:
         print(f"⚡ Calling: {func_name}({params})")
         # **kwargs 解包：把字典自动对应到函数的参数上
-        result = func(**params) 
+        result = func(client, **params)
         return result
     except Exception as e:
         return f"❌ Execution Error: {str(e)}"
 
+# 只读指令前缀：彼此之间没有依赖，可以并发执行
+READ_PREFIXES = ("get_", "list_")
+
+
+async def run_commands(client: UAVAPIClient, commands: list, think_delay: float = 1.0):
+    """
+    按顺序执行指令流：连续的只读指令并发执行 (耗时约为最慢的一次请求)，
+    控制类指令逐条执行，之后等待 think_delay 秒 (模拟思考间隔，也让无人机完成动作)。
+    """
+    for is_read, group in groupby(commands, key=lambda c: c["func"].startswith(READ_PREFIXES)):
+        group = list(group)
+        if is_read:
+            results = await asyncio.gather(*(
+                asyncio.to_thread(execute_command, client, cmd["func"], cmd["params"]) for cmd in group
+            ))
+            for result in results:
+                print(f"   -> Result: {result}\n")
+            continue
+
+        for cmd in group:
+            result = await asyncio.to_thread(execute_command, client, cmd["func"], cmd["params"])
+            print(f"   -> Result: {result}\n")
+            await asyncio.sleep(think_delay)
+
 # --- 测试代码 ---
 if __name__ == "__main__":
     # 配置
@@ -93,15 +123,4 @@ if __name__ == "__main__":
 
     print(f"🤖 开始测试通用执行器...\n")
 
-    for cmd in agent_commands:
-        f_name = cmd["func"]
-        f_params = cmd["params"]
-        
-        # 调用通用接口
-        result = execute_command(client, f_name, f_params)
-        
-        # 打印结果
-        print(f"   -> Result: {result}\n")
-        
-        # 模拟思考间隔
-        time.sleep(1)
\ No newline at end of file
+    asyncio.run(run_commands(client, agent_commands))
@@ -2,17 +2,19 @@ import sys
 import os
 import time
 import json
+import asyncio
 from pathlib import Path
 
 # --- 环境路径设置: 确保能导入 src 模块 ---
-current_dir = Path(__file__).resolve().parent
-project_root = current_dir.parent.parent
-sys.path.append(str(project_root))
+# pytest 运行时由 pytest.ini 的 pythonpath 设置；直接以脚本运行时在这里补上 (只插入一次)
+project_root = str(Path(__file__).resolve().parents[2])
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
 
 from src.uav_api_client import UAVAPIClient
 
-def test_api_permission(name, func, **kwargs):
+def check_api_permission(name, func, **kwargs):
     """
     执行单个 API 调用并根据返回结果判断权限状态
     Returns: (status_icon, status_text, execution_result)
@@ -42,6 +44,16 @@ def test_api_permission(name, func, **kwargs):
         else:
             return "⚠️", f"ERROR ({type(e).__name__})", err_msg
 
+async def probe_all(checks, max_concurrency: int = 4):
+    """并发执行一组互不依赖的只读探测，结果顺序与 checks 一致"""
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def probe(name, func, params):
+        async with semaphore:
+            return await asyncio.to_thread(check_api_permission, name, func, **params)
+
+    return await asyncio.gather(*(probe(name, func, params) for name, func, params in checks))
+
 def run_capability_scan():
     print("="*60)
     print("🕵️  UAV API Capability Scan (Student Agent Permission Check)")
@@ -65,8 +77,8 @@ def run_capability_scan():
         ("get_task_progress", client.get_task_progress, {}),
     ]
 
-    for name, func, params in global_checks:
-        icon, status, res = test_api_permission(name, func, **params)
+    # 全局接口均为只读查询，并发探测
+    for (name, _, _), (icon, status, res) in zip(global_checks, asyncio.run(probe_all(global_checks))):
         print(f"{icon} {name:<25} : {status}")
         results.append({"name": name, "status": status, "type": "Global"})
 
@@ -78,7 +90,7 @@ def run_capability_scan():
     # 先获取无人机列表
     try:
         drones = client.list_drones()
-        icon, status, _ = test_api_permission("list_drones", client.list_drones)
+        icon, status, _ = check_api_permission("list_drones", client.list_drones)
         print(f"{icon} {'list_drones':<25} : {status}")
         
         if not drones:
@@ -93,12 +105,17 @@ def run_capability_scan():
         print(f"❌ Failed to list drones: {e}")
         return
 
-    # 这里的测试按"安全性"排序，破坏性小的在前
-    drone_checks = [
-        # --- 只读/感知类 (通常允许) ---
+    # --- 只读/感知类 (通常允许)，互不依赖，并发探测 ---
+    read_checks = [
         ("get_drone_status", client.get_drone_status, {"drone_id": test_drone_id}),
         ("get_nearby_entities", client.get_nearby_entities, {"drone_id": test_drone_id}), # 重点：Student 应该用这个代替 get_targets
-        
+    ]
+    for (name, _, _), (icon, status, res) in zip(read_checks, asyncio.run(probe_all(read_checks))):
+        print(f"{icon} {name:<25} : {status}")
+        results.append({"name": name, "status": status, "type": "Drone"})
+
+    # 动作类会改变无人机状态，前后有依赖，按"安全性"顺序串行执行，破坏性小的在前
+    drone_checks = [
         # --- 动作类 (可能需要状态配合，只要不是 403 就算 Pass) ---
         ("take_photo", client.take_photo, {"drone_id": test_drone_id}),
         ("calibrate", client.calibrate, {"drone_id": test_drone_id}),
@@ -113,7 +130,7 @@ def run_capability_scan():
     ]
 
     for name, func, params in drone_checks:
-        icon, status, res = test_api_permission(name, func, **params)
+        icon, status, res = check_api_permission(name, func, **params)
         
         # 如果是因为状态不对（例如已经在地上还调用land）导致的Error，不算权限问题
         if "ERROR" in status and ("state" in str(res).lower() or "landed" in str(res).lower()):
@@ -125,7 +142,7 @@ def run_capability_scan():
             print(f"    └── Reason: {str(res)}")
         
         results.append({"name": name, "status": status, "type": "Drone"})
-        time.sleep(0.5) # 稍微暂停，避免请求过快
+        time.sleep(0.5) # 稍微暂停，等上一个动作生效
 
     # ==========================================
     # 3. 总结建议
@@ -0,0 +1,64 @@
+# tests\api\test_tool_catalog.py
+import sys
+import json
+import hashlib
+import pytest
+from pathlib import Path
+
+# --- 环境路径设置 ---
+# pytest 运行时由 pytest.ini 的 pythonpath 设置；直接以脚本运行时在这里补上 (只插入一次)
+project_root = str(Path(__file__).resolve().parents[2])
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from src.uav_api_client import UAVAPIClient
+from src2.tools_registry import UAVToolRegistry, _CANONICAL_ORDER
+
+# 固定的工具目录指纹 (快照文件，随代码提交)：工具名称/描述/参数 schema/顺序的任何变化都会导致测试失败。
+# 有意修改工具定义后运行 `python tests/api/test_tool_catalog.py` 重新生成并提交该文件。
+SNAPSHOT_FILE = Path(__file__).with_name("tool_catalog.sha256")
+
+
+def catalog_sha256(registry: UAVToolRegistry) -> str:
+    """按 get_all_tools() 的顺序序列化工具定义 (即 LLM Prompt 中的工具前缀) 并计算 SHA-256"""
+    catalog = [convert_to_openai_tool(t) for t in registry.get_all_tools()]
+    payload = json.dumps(catalog, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# 工具目录必须逐字节稳定，否则 Provider 的 Prompt 缓存每轮都会失效 (不需要连接服务器)
+@pytest.fixture(scope="module")
+def client():
+    return UAVAPIClient("http://localhost:8000")
+
+
+@pytest.fixture(scope="module")
+def registry(client):
+    return UAVToolRegistry(client)
+
+
+def test_canonical_order(registry):
+    names = tuple(t.name for t in registry.get_all_tools())
+    assert names == _CANONICAL_ORDER
+
+
+def test_catalog_is_deterministic(client, registry):
+    """两个独立构建的注册表生成完全相同的工具目录"""
+    assert catalog_sha256(registry) == catalog_sha256(UAVToolRegistry(client))
+
+
+def test_catalog_matches_snapshot(registry):
+    assert SNAPSHOT_FILE.exists(), f"缺少快照文件 {SNAPSHOT_FILE.name}；请运行 `python {Path(__file__).name}` 生成并提交"
+    digest = catalog_sha256(registry)
+    print(f"\n   🔑 Tool catalog SHA-256: {digest}")
+    assert digest == SNAPSHOT_FILE.read_text(encoding="utf-8").strip(), \
+        "工具目录发生变化；如为有意修改，请运行本文件重新生成快照并提交"
+
+
+if __name__ == "__main__":
+    # 有意修改工具定义后，重新生成快照文件
+    digest = catalog_sha256(UAVToolRegistry(UAVAPIClient("http://localhost:8000")))
+    SNAPSHOT_FILE.write_text(digest + "\n", encoding="utf-8")
+    print(f"✅ 已写入 {SNAPSHOT_FILE.name}: {digest}")
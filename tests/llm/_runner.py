@@ -0,0 +1,12 @@
+# tests/llm/_runner.py
+"""LLM 测试的公共流程：调用模型、打印回复并返回内容 (异常交给 pytest 报告)"""
+
+
+def run_case(llm, messages, label: str = "LLM") -> str:
+    """用 messages 调用一次 llm，打印并返回回复内容"""
+    print(f"\n🚀 发送请求给 {label}...")
+    print("-" * 50)
+    response = llm.invoke(messages)
+    print(response.content)
+    print("-" * 50)
+    return response.content
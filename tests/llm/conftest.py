@@ -0,0 +1,64 @@
+# tests/llm/conftest.py
+from pathlib import Path
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from src.llm_service import LLMService
+
+CONFIG_PATH = Path(__file__).resolve().parents[2] / "config" / "llm_config.json"
+
+
+@pytest.fixture(scope="session")
+def llm_service():
+    """整个测试会话只读取一次配置文件"""
+    return LLMService(config_path=str(CONFIG_PATH))
+
+
+# 连通性测试只需要短回复，限制生成长度以缩短解码时间
+MAX_TOKENS = 32
+
+# 探测 Provider 是否可达的超时 (秒)
+PROBE_TIMEOUT = 3
+
+
+@pytest.fixture(scope="session")
+def http_client():
+    """会话内共享的 HTTP 连接池 (供 openai 兼容 Provider 使用)，会话结束时关闭"""
+    import httpx
+    client = httpx.Client(timeout=60, limits=httpx.Limits(max_keepalive_connections=16, max_connections=32))
+    yield client
+    client.close()
+
+
+@pytest.fixture(scope="session")
+def get_llm(llm_service, http_client):
+    """
+    按 Provider 名称获取模型实例，同一 Provider 在会话内只创建一次。
+    Provider 服务不可达 (如本地未启动 Ollama、离线运行) 时跳过调用它的测试，而不是报错。
+    """
+    import httpx
+    cache = {}
+    unreachable = {}
+
+    def _get(provider: str):
+        if provider in unreachable:
+            pytest.skip(unreachable[provider])
+        if provider not in cache:
+            base_url = llm_service.get_provider_config(provider).get("base_url")
+            if base_url:
+                try:
+                    # 只确认能建立连接，任何 HTTP 响应 (包括 404) 都视为可达
+                    http_client.get(base_url, timeout=PROBE_TIMEOUT)
+                except httpx.TransportError as e:
+                    unreachable[provider] = f"Provider {provider} 不可达 ({base_url}): {e}"
+                    pytest.skip(unreachable[provider])
+            llm = llm_service.create_llm(provider, max_tokens=MAX_TOKENS, http_client=http_client)
+            # Ollama 首次请求要把模型加载进显存 (数秒)，在创建时预热 1 个 token，避免计入各测试的耗时；
+            # create_llm 已设置 keep_alive=-1，模型在整个会话内常驻。预热失败不影响测试自身报告错误
+            llm_service.warm_up_prefix(llm, [HumanMessage(content="ping")])
+            cache[provider] = llm
+        return cache[provider]
+
+    return _get
+
@@ -8,9 +8,10 @@ from pathlib import Path
 
 # --- 环境路径设置 ---
 # 确保能找到 src 目录和 uav_api_client
-current_dir = Path(__file__).parent
-project_root = current_dir.parent.parent
-sys.path.append(str(project_root))
+# pytest 运行时由 pytest.ini 的 pythonpath 设置；直接以脚本运行时在这里补上 (只插入一次)
+project_root = str(Path(__file__).resolve().parents[2])
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 from src.uav_api_client import UAVAPIClient
 from src.context_manager import DroneContextManager
 
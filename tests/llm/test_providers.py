@@ -0,0 +1,111 @@
+# tests/llm/test_providers.py
+import sys
+import time
+import asyncio
+from pathlib import Path
+
+import pytest
+
+# pytest 运行时由 pytest.ini 的 pythonpath 设置；直接以脚本运行时在这里补上 (只插入一次)
+project_root = str(Path(__file__).resolve().parents[2])
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from tests.llm._runner import run_case
+
+
+# 测试用 Prompt (消息对象构造会做 Pydantic 校验，在模块级构建一次)
+# 系统提示相同，两条用户消息一次 batch 发出
+SYSTEM_MESSAGE = SystemMessage(content="你是一个专业的无人机控制助手。请简短回答。")
+USER_PROMPTS = (
+    "你好，请介绍一下你自己。",
+    "无人机起飞前需要检查哪些事项？",
+)
+
+
+# 参与测试的 Provider (对应配置文件中 providers 下的 key)
+PROVIDERS = ("Ollama",)  # 配置好 DEEPSEEK_API_KEY 后加入 "DeepSeek"
+
+
+def _build_messages(prompt: str) -> list:
+    """系统提示 + 一条用户消息"""
+    return [SYSTEM_MESSAGE, HumanMessage(content=prompt)]
+
+
+_MESSAGES = _build_messages(USER_PROMPTS[0])
+
+
+@pytest.mark.parametrize("provider", PROVIDERS)
+def test_first_token(get_llm, provider):
+    """流式读取到第一个 chunk 即可确认通道正常，同时测量首 token 延迟 (TTFT)"""
+    llm = get_llm(provider)
+    start = time.perf_counter()
+    stream = llm.stream(_MESSAGES)
+    try:
+        first = next(stream)
+    finally:
+        stream.close()  # 不再等待剩余 token
+    ttft_ms = (time.perf_counter() - start) * 1000
+
+    print(f"\n⏱️ [{provider}] TTFT: {ttft_ms:.0f} ms | 首个 chunk: {first.content!r}")
+    assert first.content is not None
+
+
+@pytest.mark.parametrize("provider", PROVIDERS)
+def test_chat(get_llm, provider):
+    """每个 Provider 走同一条单轮对话流程，新增 Provider 只需在 PROVIDERS 中加一项"""
+    content = run_case(get_llm(provider), _MESSAGES, label=provider)
+    assert content
+
+
+@pytest.mark.parametrize("provider", PROVIDERS)
+def test_batch(get_llm, provider):
+    # 模型实例由 tests/llm/conftest.py 的 get_llm 提供，每个 Provider 会话内只创建一次
+    llm = get_llm(provider)
+
+    # 1. 构造测试消息
+    all_messages = [_build_messages(prompt) for prompt in USER_PROMPTS]
+
+    print(f"\n🚀 发送 {len(all_messages)} 条请求给 {provider} (batch)...")
+
+    # 2. 并发调用模型 (异常交给 pytest 报告)；
+    #    服务端需设置 OLLAMA_NUM_PARALLEL>1 才会真正并行解码，否则请求在服务端排队
+    responses = llm.batch(all_messages, config={"max_concurrency": 4})
+
+    assert len(responses) == len(all_messages)
+    for prompt, response in zip(USER_PROMPTS, responses):
+        print("-" * 50)
+        print(f"❓ {prompt}")
+        print(response.content)
+        assert response.content
+    print("-" * 50)
+    print("✅ 测试成功！LLM 通信正常。")
+
+
+def test_providers_concurrently(get_llm):
+    """同一条消息并发发给所有 Provider，总耗时约为最慢的一个；单个 Provider 失败不影响其他结果的输出"""
+    llms = {provider: get_llm(provider) for provider in PROVIDERS}
+
+    async def ask_all():
+        return await asyncio.gather(*(llm.ainvoke(_MESSAGES) for llm in llms.values()), return_exceptions=True)
+
+    # 用 asyncio.run 驱动协程，不依赖 pytest-asyncio 插件
+    results = asyncio.run(ask_all())
+
+    failures = {}
+    for name, result in zip(llms, results):
+        print("-" * 50)
+        if isinstance(result, BaseException):
+            print(f"❌ [{name}] {type(result).__name__}: {result}")
+            failures[name] = result
+        else:
+            print(f"✅ [{name}] {result.content}")
+    print("-" * 50)
+
+    assert not failures, f"Provider 调用失败: {list(failures)}"
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-s"]))
@@ -0,0 +1,56 @@
+# tests\test_json_repair.py
+"""容错 JSON 解析的单元测试 (纯逻辑，不需要连接模型或服务器)"""
+import pytest
+
+from src.json_repair import StreamingJSONExtractor, parse_json_lenient, repair_json
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"x": 1, "y": 2', {"x": 1, "y": 2}),
+    ('{"x": 1, "y": ', {"x": 1, "y": None}),
+    ('{"name": "dro', {"name": "dro"}),
+    ('{"path": [[1, 2], [3', {"path": [[1, 2], [3]]}),
+])
+def test_truncated_objects_are_closed(text, expected):
+    assert parse_json_lenient(text) == expected
+
+
+def test_fenced_block_with_chatter():
+    text = 'Here is your JSON:\n```json\n{"x": 10, "y": 20, "z": 5}\n```\nHope this helps!'
+    assert parse_json_lenient(text) == {"x": 10, "y": 20, "z": 5}
+
+
+def test_trailing_commas_and_python_literals():
+    text = '{"ok": True, "err": None, "items": [1, 2, ], "done": False, }'
+    assert parse_json_lenient(text) == {"ok": True, "err": None, "items": [1, 2], "done": False}
+
+
+def test_literals_inside_strings_are_untouched():
+    assert parse_json_lenient('{"msg": "None, True, }"}') == {"msg": "None, True, }"}
+
+
+def test_no_json_raises_value_error():
+    with pytest.raises(ValueError):
+        repair_json("抱歉，我无法回答。")
+
+
+def test_streaming_extracts_as_soon_as_object_closes():
+    extractor = StreamingJSONExtractor()
+    chunks = ["好的：```json\n{\"x\": 1", ", \"y\": {\"a\": \"}\"}", ", \"z\": 3}", "\n```\n以上是结果。"]
+
+    assert extractor.feed(chunks[0]) is None
+    assert extractor.feed(chunks[1]) is None
+    assert extractor.feed(chunks[2]) == {"x": 1, "y": {"a": "}"}, "z": 3}
+    assert extractor.done
+
+    # 闭合之后的文本只累计，不再解析
+    assert extractor.feed(chunks[3]) is None
+    assert extractor.text == "".join(chunks)
+
+
+def test_streaming_without_close_yields_nothing():
+    extractor = StreamingJSONExtractor()
+    for chunk in ('{"x": 1,', ' "y": 2'):
+        assert extractor.feed(chunk) is None
+    assert not extractor.done
+    assert extractor.result is None
@@ -0,0 +1,35 @@
+# tests\test_schemas.py
+"""MissionPlan 解析的单元测试 (纯逻辑，不需要连接模型或服务器)"""
+import pytest
+from pydantic import ValidationError
+
+from src2.schemas import MissionPlan, MoveToParams, TakeOffAction
+
+
+def test_plan_with_extra_param_key_is_accepted():
+    """LLM 在某一步多给了字段时，整个计划仍可解析，多余字段被丢弃"""
+    raw = (
+        '{"mission_steps": ['
+        '{"func": "take_off", "params": {"drone_id": "d1", "altitude": 15, "speed": 3}},'
+        '{"func": "move_to", "thought": "go", "params": {"drone_id": "d1", "x": 1, "y": 2, "z": 3}}'
+        '], "comment": "extra top-level key"}'
+    )
+    plan = MissionPlan.model_validate_json(raw)
+
+    take_off, move_to = plan.mission_steps
+    assert isinstance(take_off, TakeOffAction)
+    assert dict(take_off.params) == {"drone_id": "d1", "altitude": 15.0}
+    assert isinstance(move_to.params, MoveToParams)
+    assert move_to.drone_id == "d1"
+
+
+def test_plan_with_invalid_param_value_is_rejected():
+    raw = '{"mission_steps": [{"func": "take_off", "params": {"drone_id": "d1", "altitude": -5}}]}'
+    with pytest.raises(ValidationError):
+        MissionPlan.model_validate_json(raw)
+
+
+def test_params_are_frozen():
+    params = MoveToParams(drone_id="d1", x=1, y=2, z=3)
+    with pytest.raises(ValidationError):
+        params.x = 5
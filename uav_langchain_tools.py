@@ -9,6 +9,11 @@ from uav_api_client import UAVAPIClient
 import json
 
 
+def _dumps(obj) -> str:
+    """Serialize a tool result compactly; the LLM reads it, so indentation only costs tokens"""
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
 def create_uav_tools(client: UAVAPIClient) -> list:
     """
     Create all UAV control tools for LangChain agent using @tool decorator
@@ -25,7 +30,7 @@ def create_uav_tools(client: UAVAPIClient) -> list:
         No input required."""
         try:
             drones = client.list_drones()
-            return json.dumps(drones, indent=2)
+            return _dumps(drones)
         except Exception as e:
             return f"Error listing drones: {str(e)}"
 
@@ -37,7 +42,7 @@ def create_uav_tools(client: UAVAPIClient) -> list:
         No input required."""
         try:
             session = client.get_current_session()
-            return json.dumps(session, indent=2)
+            return _dumps(session)
         except Exception as e:
             return f"Error getting session info: {str(e)}"
 
@@ -49,7 +54,7 @@ def create_uav_tools(client: UAVAPIClient) -> list:
         No input required."""
         try:
             progress = client.get_task_progress()
-            return json.dumps(progress, indent=2)
+            return _dumps(progress)
         except Exception as e:
             return f"Error getting task progress: {str(e)}"
 
@@ -61,7 +66,7 @@ def create_uav_tools(client: UAVAPIClient) -> list:
         No input required."""
         try:
             weather = client.get_weather()
-            return json.dumps(weather, indent=2)
+            return _dumps(weather)
         except Exception as e:
             return f"Error getting weather: {str(e)}"
 
@@ -73,7 +78,7 @@ def create_uav_tools(client: UAVAPIClient) -> list:
     #     No input required."""
     #     try:
     #         targets = client.get_targets()
-    #         return json.dumps(targets, indent=2)
+    #         return _dumps(targets)
     #     except Exception as e:
     #         return f"Error getting targets: {str(e)}"
 
@@ -85,7 +90,7 @@ def create_uav_tools(client: UAVAPIClient) -> list:
     #     No input required."""
     #     try:
     #         obstacles = client.get_obstacles()
-    #         return json.dumps(obstacles, indent=2)
+    #         return _dumps(obstacles)
     #     except Exception as e:
     #         return f"Error getting obstacles: {str(e)}"
 
@@ -107,7 +112,7 @@ def create_uav_tools(client: UAVAPIClient) -> list:
                 return "Error: drone_id is required"
 
             status = client.get_drone_status(drone_id)
-            return json.dumps(status, indent=2)
+            return _dumps(status)
         except json.JSONDecodeError as e:
             return f"Error parsing JSON input: {str(e)}. Expected format: {{\"drone_id\": \"drone-001\"}}"
         except Exception as e:
@@ -130,7 +135,7 @@ def create_uav_tools(client: UAVAPIClient) -> list:
                 return "Error: drone_id is required"
 
             nearby = client.get_nearby_entities(drone_id)
-            return json.dumps(nearby, indent=2)
+            return _dumps(nearby)
         except json.JSONDecodeError as e:
             return f"Error parsing JSON input: {str(e)}. Expected format: {{\"drone_id\": \"drone-001\"}}"
         except Exception as e:
@@ -153,7 +158,7 @@ def create_uav_tools(client: UAVAPIClient) -> list:
                 return "Error: drone_id is required"
 
             result = client.land(drone_id)
-            return json.dumps(result, indent=2)
+            return _dumps(result)
         except json.JSONDecodeError as e:
             return f"Error parsing JSON input: {str(e)}. Expected format: {{\"drone_id\": \"drone-001\"}}"
         except Exception as e:
@@ -178,7 +183,7 @@ def create_uav_tools(client: UAVAPIClient) -> list:
                 return "Error: drone_id is required"
 
             result = client.hover(drone_id, duration)
-            return json.dumps(result, indent=2)
+            return _dumps(result)
         except json.JSONDecodeError as e:
             return f"Error parsing JSON input: {str(e)}. Expected format: {{\"drone_id\": \"drone-001\"}}"
         except Exception as e:
@@ -201,7 +206,7 @@ def create_uav_tools(client: UAVAPIClient) -> list:
                 return "Error: drone_id is required"
 
             result = client.return_home(drone_id)
-            return json.dumps(result, indent=2)
+            return _dumps(result)
         except json.JSONDecodeError as e:
             return f"Error parsing JSON input: {str(e)}. Expected format: {{\"drone_id\": \"drone-001\"}}"
         except Exception as e:
@@ -224,7 +229,7 @@ def create_uav_tools(client: UAVAPIClient) -> list:
                 return "Error: drone_id is required"
 
             result = client.set_home(drone_id)
-            return json.dumps(result, indent=2)
+            return _dumps(result)
         except json.JSONDecodeError as e:
             return f"Error parsing JSON input: {str(e)}. Expected format: {{\"drone_id\": \"drone-001\"}}"
         except Exception as e:
@@ -247,7 +252,7 @@ def create_uav_tools(client: UAVAPIClient) -> list:
                 return "Error: drone_id is required"
 
             result = client.calibrate(drone_id)
-            return json.dumps(result, indent=2)
+            return _dumps(result)
         except json.JSONDecodeError as e:
             return f"Error parsing JSON input: {str(e)}. Expected format: {{\"drone_id\": \"drone-001\"}}"
         except Exception as e:
@@ -270,7 +275,7 @@ def create_uav_tools(client: UAVAPIClient) -> list:
                 return "Error: drone_id is required"
 
             result = client.take_photo(drone_id)
-            return json.dumps(result, indent=2)
+            return _dumps(result)
         except json.JSONDecodeError as e:
             return f"Error parsing JSON input: {str(e)}. Expected format: {{\"drone_id\": \"drone-001\"}}"
         except Exception as e:
@@ -298,7 +303,7 @@ def create_uav_tools(client: UAVAPIClient) -> list:
                 return "Error: drone_id is required"
 
             result = client.take_off(drone_id, altitude)
-            return json.dumps(result, indent=2)
+            return _dumps(result)
         except json.JSONDecodeError as e:
             return f"Error parsing JSON input: {str(e)}. Expected format: {{\"drone_id\": \"drone-001\", \"altitude\": 15.0}}"
         except Exception as e:
@@ -325,7 +330,7 @@ def create_uav_tools(client: UAVAPIClient) -> list:
                 return "Error: altitude is required"
 
             result = client.change_altitude(drone_id, altitude)
-            return json.dumps(result, indent=2)
+            return _dumps(result)
         except json.JSONDecodeError as e:
             return f"Error parsing JSON input: {str(e)}. Expected format: {{\"drone_id\": \"drone-001\", \"altitude\": 20.0}}"
         except Exception as e:
@@ -353,7 +358,7 @@ def create_uav_tools(client: UAVAPIClient) -> list:
                 return "Error: heading is required"
 
             result = client.rotate(drone_id, heading)
-            return json.dumps(result, indent=2)
+            return _dumps(result)
         except json.JSONDecodeError as e:
             return f"Error parsing JSON input: {str(e)}. Expected format: {{\"drone_id\": \"drone-001\", \"heading\": 90.0}}"
         except Exception as e:
@@ -384,7 +389,7 @@ def create_uav_tools(client: UAVAPIClient) -> list:
                 return "Error: message is required"
 
             result = client.send_message(drone_id, target_drone_id, message)
-            return json.dumps(result, indent=2)
+            return _dumps(result)
         except json.JSONDecodeError as e:
             return f"Error parsing JSON input: {str(e)}. Expected format: {{\"drone_id\": \"drone-001\", \"target_drone_id\": \"drone-002\", \"message\": \"...\"}}"
         except Exception as e:
@@ -411,7 +416,7 @@ def create_uav_tools(client: UAVAPIClient) -> list:
                 return "Error: message is required"
 
             result = client.broadcast(drone_id, message)
-            return json.dumps(result, indent=2)
+            return _dumps(result)
         except json.JSONDecodeError as e:
             return f"Error parsing JSON input: {str(e)}. Expected format: {{\"drone_id\": \"drone-001\", \"message\": \"...\"}}"
         except Exception as e:
@@ -439,7 +444,7 @@ def create_uav_tools(client: UAVAPIClient) -> list:
                 return "Error: charge_amount is required"
 
             result = client.charge(drone_id, charge_amount)
-            return json.dumps(result, indent=2)
+            return _dumps(result)
         except json.JSONDecodeError as e:
             return f"Error parsing JSON input: {str(e)}. Expected format: {{\"drone_id\": \"drone-001\", \"charge_amount\": 25.0}}"
         except Exception as e:
@@ -470,7 +475,7 @@ def create_uav_tools(client: UAVAPIClient) -> list:
                 return "Error: distance is required"
 
             result = client.move_towards(drone_id, distance, heading, dz)
-            return json.dumps(result, indent=2)
+            return _dumps(result)
         except json.JSONDecodeError as e:
             return f"Error parsing JSON input: {str(e)}. Expected format: {{\"drone_id\": \"drone-001\", \"distance\": 10.0}}"
         except Exception as e:
@@ -497,7 +502,7 @@ def create_uav_tools(client: UAVAPIClient) -> list:
     #             return "Error: waypoints list is required"
 
     #         result = client.move_along_path(drone_id, waypoints)
-    #         return json.dumps(result, indent=2)
+    #         return _dumps(result)
     #     except json.JSONDecodeError as e:
     #         return f"Error parsing JSON input: {str(e)}. Expected format: {{\"drone_id\": \"drone-001\", \"waypoints\": [...]}}"
     #     except Exception as e:
@@ -531,7 +536,7 @@ def create_uav_tools(client: UAVAPIClient) -> list:
                 return "Error: x, y, and z coordinates are required"
 
             result = client.move_to(drone_id, x, y, z)
-            return json.dumps(result, indent=2)
+            return _dumps(result)
         except json.JSONDecodeError as e:
             return f"Error parsing JSON input: {str(e)}. Expected format: {{\"drone_id\": \"drone-001\", \"x\": 100.0, \"y\": 50.0, \"z\": 20.0}}"
         except Exception as e: